@@ -10,7 +10,8 @@ import { apiService } from '@/services/api';
 
 export const ChatInterface: React.FC = () => {
   const [session, setSession] = useState<ChatSession>({
-    id: 'default',
+    // The server keeps each session's conversation state under this id, so it must be unique
+    id: crypto.randomUUID(),
     title: 'Research Session',
     messages: [],
     createdAt: new Date(),
@@ -61,18 +62,57 @@ export const ChatInterface: React.FC = () => {
       processingType: 'classification'
     }));
 
+    // Placeholder assistant message that fills in as the response streams
+    const streamingId = (Date.now() + 1).toString();
+    const updateStreamingMessage = (update: (message: Message) => Message) => {
+      setSession(prev => ({
+        ...prev,
+        messages: prev.messages.map(message => message.id === streamingId ? update(message) : message)
+      }));
+    };
+
     try {
-      // Use the real API to handle the chat
-      const assistantMessage = await apiService.chat({
-        message: messageContent,
-        sessionId: session.id,
-        history: session.messages
-      });
+      setSession(prev => ({
+        ...prev,
+        messages: [...prev.messages, { id: streamingId, role: 'assistant', content: '', timestamp: new Date() }],
+        updatedAt: new Date()
+      }));
 
-      // Add assistant message to session
+      // Stream the chat turn so the router decision, sources and summary show up as they arrive
+      const assistantMessage = await apiService.chatStream(
+        {
+          // The server restores the conversation from the session, so only the new message is sent
+          message: messageContent,
+          sessionId: session.id
+        },
+        {
+          onRouter: (event) => {
+            setFlowState(prev => ({
+              ...prev,
+              researchQuery: event.research_query ?? undefined,
+              processingType: event.intent
+            }));
+            updateStreamingMessage(message => ({ ...message, intent: event.intent }));
+          },
+          onSource: (source) => {
+            updateStreamingMessage(message => ({
+              ...message,
+              sources: [
+                ...(message.sources ?? []),
+                { id: String(source.index), title: source.title, url: source.url, description: source.snippet, type: 'paper' }
+              ]
+            }));
+          },
+          onToken: (text) => {
+            updateStreamingMessage(message => ({ ...message, content: message.content + text }));
+          }
+        }
+      );
+
+      // Replace the placeholder with the final assistant message
       setSession(prev => ({
         ...prev,
-        messages: [...prev.messages, assistantMessage],
+        messages: prev.messages.map(message => message.id === streamingId ? assistantMessage : message),
         updatedAt: new Date()
       }));
 
@@ -86,7 +126,7 @@ export const ChatInterface: React.FC = () => {
       
       // Add error message
       const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: (Date.now() + 2).toString(),
         role: 'assistant',
         content: "I apologize, but I encountered an error while processing your request. Please try again.",
         timestamp: new Date()
@@ -94,7 +134,7 @@ export const ChatInterface: React.FC = () => {
       
       setSession(prev => ({
         ...prev,
-        messages: [...prev.messages, errorMessage]
+        messages: [...prev.messages.filter(message => message.id !== streamingId), errorMessage]
       }));
     } finally {
       // Reset processing state
@@ -108,7 +148,7 @@ export const ChatInterface: React.FC = () => {
 
   const handleNewSession = () => {
     setSession({
-      id: Date.now().toString(),
+      id: crypto.randomUUID(),
       title: 'Research Session',
       messages: [],
       createdAt: new Date(),
@@ -1,4 +1,4 @@
-import { Message, IntentClassification, ResearchResult } from '@/types/research';
+import { Message, IntentClassification, ResearchResult, ChatStreamHandlers } from '@/types/research';
 
 // Use environment variable, detect production, or fallback to localhost for development
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 
@@ -8,6 +8,8 @@ interface ChatRequest {
   message: string;
   sessionId?: string;
   history?: Message[];
+  engine?: 'agent' | 'direct';
+  budgetSeconds?: number;
 }
 
 interface ClassifyIntentRequest {
@@ -17,6 +19,7 @@ interface ClassifyIntentRequest {
 
 interface ResearchRequest {
   query: string;
+  budgetSeconds?: number;
 }
 
 interface ConversationRequest {
@@ -57,6 +60,88 @@ class ApiService {
     };
   }
 
+  /**
+   * Stream a chat turn from /api/chat/stream. Handlers fire as server-sent events
+   * arrive; the promise resolves with the final message (same shape as chat()).
+   */
+  async chatStream(request: ChatRequest, handlers: ChatStreamHandlers = {}, signal?: AbortSignal): Promise<Message> {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'text/event-stream',
+      },
+      body: JSON.stringify(request),
+      signal,
+    });
+
+    if (!response.ok || !response.body) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || `API Error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let finalMessage: Message | null = null;
+
+    const dispatch = (block: string) => {
+      let event = 'message';
+      const dataLines: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+      }
+      if (dataLines.length === 0) return;
+      const data = JSON.parse(dataLines.join('\n'));
+
+      switch (event) {
+        case 'router':
+          handlers.onRouter?.(data);
+          break;
+        case 'search_started':
+          handlers.onSearchStarted?.(data);
+          break;
+        case 'search_finished':
+          handlers.onSearchFinished?.(data);
+          break;
+        case 'source':
+          handlers.onSource?.(data);
+          break;
+        case 'token':
+          handlers.onToken?.(data.text);
+          break;
+        case 'partial':
+          handlers.onPartial?.(data);
+          break;
+        case 'done':
+          finalMessage = { ...data, timestamp: new Date(data.timestamp) };
+          handlers.onDone?.(finalMessage);
+          break;
+        case 'error':
+          throw new Error(data.detail || 'Streaming error');
+      }
+    };
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        dispatch(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+    if (buffer.trim()) dispatch(buffer);
+
+    if (!finalMessage) {
+      throw new Error('Stream ended before the response was complete');
+    }
+    return finalMessage;
+  }
+
   async classifyIntent(request: ClassifyIntentRequest): Promise<IntentClassification> {
     return this.request<IntentClassification>('/api/classify-intent', {
       method: 'POST',
@@ -6,6 +6,7 @@ export interface Message {
   intent?: 'research' | 'conversation';
   sources?: ResearchSource[];
   reasoning?: string;
+  partial?: boolean | null;
 }
 
 export interface ResearchSource {
@@ -34,6 +35,7 @@ export interface ResearchResult {
   summary: string;
   sources: ResearchSource[];
   topics: string[];
+  partial?: boolean;
 }
 
 export interface ChatSession {
@@ -52,4 +54,42 @@ export interface FlowState {
   searchResults?: ResearchResult;
   isProcessing: boolean;
   processingType?: 'classification' | 'research' | 'conversation';
-}
\ No newline at end of file
+}
+
+export interface RouterEvent {
+  intent: 'research' | 'conversation';
+  research_query?: string | null;
+  confidence?: number | null;
+  reasoning?: string | null;
+}
+
+export interface SearchStartedEvent {
+  query: string;
+  engine: 'agent' | 'direct';
+}
+
+export interface SearchFinishedEvent {
+  query: string;
+  source_count: number;
+}
+
+export interface SourceEvent {
+  index: number;
+  url: string;
+  title: string;
+  snippet: string;
+}
+
+export interface PartialEvent {
+  reason: string;
+}
+
+export interface ChatStreamHandlers {
+  onRouter?: (event: RouterEvent) => void;
+  onSearchStarted?: (event: SearchStartedEvent) => void;
+  onSearchFinished?: (event: SearchFinishedEvent) => void;
+  onSource?: (event: SourceEvent) => void;
+  onToken?: (text: string) => void;
+  onPartial?: (event: PartialEvent) => void;
+  onDone?: (message: Message) => void;
+}
@@ -1,19 +1,39 @@
 #!/usr/bin/env python3
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any
+from typing import List, Optional, Literal, Dict, Any, Tuple
 from datetime import datetime
 import uuid
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
 
 from crewai_flow_workshop1.main import DeepResearchFlow, RouterIntent, SearchResult, Message as CrewAIMessage
+from crewai_flow_workshop1.batch_router import classify_messages
+from crewai_flow_workshop1.budget import LatencyBudget, budget_scope, budget_stats, default_budget
+from crewai_flow_workshop1.cancellation import CancelToken, FlowCancelled, cancel_scope, cancellation_stats, default_deadline
+from crewai_flow_workshop1.intent_classifier import get_intent_classifier
+from crewai_flow_workshop1.jobs import Job, QueueFullError, get_job_queue
+from crewai_flow_workshop1.persistence import get_flow_persistence
+from crewai_flow_workshop1.prefetch import prefetch_stats
+from crewai_flow_workshop1.registry import registry_stats
+from crewai_flow_workshop1.research_engines import research_engine_stats
+from crewai_flow_workshop1.router_cache import get_router_cache
+from crewai_flow_workshop1.scheduler import get_scheduler
+from crewai_flow_workshop1.session_store import get_session_store, session_locks
+from crewai_flow_workshop1.single_flight import SingleFlight, research_flights
+from crewai_flow_workshop1.streaming import sse_event
+from crewai_flow_workshop1.tools.corpus_index import get_corpus_index
+from crewai_flow_workshop1.tools.dedup import dedup_stats
+from crewai_flow_workshop1.tools.deep_research_paper import DeepResearchPaper
+from crewai_flow_workshop1.tools.http_client import get_http_client
+from crewai_flow_workshop1.tools.resilience import get_resilient_caller
+from crewai_flow_workshop1.tools.search_cache import get_search_cache, normalize_query
 
 app = FastAPI(title="CrewAI Research API", version="1.0.0")
 
@@ -46,6 +66,8 @@ class ResearchResult(BaseModel):
     summary: str
     sources: List[ResearchSource]
     topics: List[str]
+    # The latency budget ran out before the research finished
+    partial: bool = False
 
 class Message(BaseModel):
     id: str
@@ -55,6 +77,7 @@ class Message(BaseModel):
     intent: Optional[Literal["research", "conversation"]] = None
     sources: Optional[List[ResearchSource]] = None
     reasoning: Optional[str] = None
+    partial: Optional[bool] = None
 
 class ChatSession(BaseModel):
     id: str
@@ -62,6 +85,12 @@ class ChatSession(BaseModel):
     messages: List[Message]
     createdAt: datetime
     updatedAt: datetime
+    messageCount: Optional[int] = None
+    nextCursor: Optional[str] = None
+
+class MessagesPage(BaseModel):
+    messages: List[Message]
+    nextCursor: Optional[str] = None
 
 class FlowState(BaseModel):
     currentMessage: str
@@ -76,22 +105,46 @@ class FlowState(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     sessionId: Optional[str] = None
+    # Only used to seed a session the server has no flow state for yet
     history: Optional[List[Message]] = []
+    engine: Optional[Literal["agent", "direct"]] = None
+    # End-to-end latency budget; past it the answer degrades to partial results
+    budgetSeconds: Optional[float] = Field(default=None, gt=0, le=600)
 
 class ClassifyIntentRequest(BaseModel):
     message: str
     history: Optional[List[Message]] = []
 
+class ClassifyIntentBatchRequest(BaseModel):
+    messages: List[str]
+    chunkSize: Optional[int] = Field(default=None, ge=1, le=50)
+
 class ResearchRequest(BaseModel):
     query: str
+    engine: Optional[Literal["agent", "direct"]] = None
+    budgetSeconds: Optional[float] = Field(default=None, gt=0, le=600)
+
+class SearchRequest(BaseModel):
+    query: str
+    budgetSeconds: Optional[float] = Field(default=None, gt=0, le=600)
+
+class ResearchJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: Dict[str, Any]
+    result: Optional[ResearchResult] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
 
 class ConversationRequest(BaseModel):
     message: str
     history: Optional[List[Message]] = []
 
-# In-memory storage for sessions (replace with database in production)
-sessions: Dict[str, ChatSession] = {}
-executor = ThreadPoolExecutor(max_workers=4)
+research_request_flights = SingleFlight()
+MAX_BATCH_CLASSIFY = int(os.getenv("ROUTER_BATCH_MAX_MESSAGES", "1000"))
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
 
 def convert_crewai_sources_to_api(sources_list) -> List[ResearchSource]:
     """Convert CrewAI sources to API format with Unicode cleaning"""
@@ -119,135 +172,427 @@ def convert_crewai_sources_to_api(sources_list) -> List[ResearchSource]:
             continue
     return api_sources
 
-async def run_crewai_flow(message: str) -> Dict[str, Any]:
-    """Run CrewAI flow in thread executor to avoid blocking"""
-    def _run_flow():
+def flow_inputs(message: str, engine: Optional[str] = None, session_id: Optional[str] = None,
+                history: Optional[List[Message]] = None) -> Dict[str, Any]:
+    """
+    Kickoff inputs for one turn.
+
+    A session's flow state is persisted under the session id, so passing it as
+    the flow id resumes the conversation (history, rolling summary) the same
+    way terminal_chat.py does. Client-sent history only seeds new sessions.
+    """
+    inputs: Dict[str, Any] = {"user_message": message}
+    if engine:
+        inputs["research_engine"] = engine
+    if session_id:
+        inputs["id"] = session_id
+        if history and get_flow_persistence().load_state(session_id) is None:
+            inputs["message_history"] = [
+                CrewAIMessage(role=item.role, content=item.content, timestamp=item.timestamp.isoformat()).model_dump()
+                for item in history
+            ]
+    return inputs
+
+def turn_limits(budget_seconds: Optional[float] = None) -> Tuple[CancelToken, Optional[LatencyBudget]]:
+    """
+    Cancel token and latency budget for one request.
+
+    The budget is soft: the flow fits its work into it and returns partial
+    results. The token's hard deadline is the server deadline, tightened to
+    the budget plus BUDGET_GRACE_SECONDS.
+    """
+    seconds = budget_seconds or default_budget()
+    if not seconds:
+        return CancelToken(default_deadline()), None
+    deadline = seconds + float(os.getenv("BUDGET_GRACE_SECONDS", "5"))
+    if default_deadline():
+        deadline = min(deadline, default_deadline())
+    return CancelToken(deadline), LatencyBudget(seconds)
+
+def kickoff_flow(inputs: Dict[str, Any], sink=None, cancel_token: Optional[CancelToken] = None,
+                 budget: Optional[LatencyBudget] = None) -> DeepResearchFlow:
+    """Run one flow turn in the calling thread, one turn at a time per session"""
+    flow = DeepResearchFlow(tracing=False)
+    if sink is not None:
+        flow.set_event_sink(sink)
+    if cancel_token is not None:
+        flow.set_cancel_token(cancel_token)
+    if budget is not None:
+        flow.set_latency_budget(budget)
+    if "id" in inputs:
+        with session_locks.hold(inputs["id"]):
+            flow.kickoff(inputs=inputs)
+    else:
+        flow.kickoff(inputs=inputs)
+    return flow
+
+def predict_lane(inputs: Dict[str, Any], cancel_token: Optional[CancelToken] = None,
+                 budget: Optional[LatencyBudget] = None) -> str:
+    """
+    Scheduling lane for a turn: "research" or "conversation".
+
+    The message is routed up front on a throwaway flow holding the session's
+    history, so the decision lands in the router cache and the flow's own
+    router reuses it instead of classifying twice.
+    """
+    flow = DeepResearchFlow(tracing=False)
+    if cancel_token is not None:
+        flow.set_cancel_token(cancel_token)
+    if budget is not None:
+        flow.set_latency_budget(budget)
+    stored = get_flow_persistence().load_state(inputs["id"]) if "id" in inputs else None
+    source = stored or inputs
+    flow.state.message_history = [CrewAIMessage.model_validate(item) for item in source.get("message_history") or []]
+    flow.state.history_summary = source.get("history_summary") or ""
+    # The rendered window (and so the router prompt and cache key) depends on how much is already summarized
+    flow.state.summarized_count = source.get("summarized_count") or 0
+    flow.state.user_message = inputs["user_message"]
+    flow.add_message("user", inputs["user_message"])
+    try:
+        return "research" if flow.decide_intent() == "research" else "conversation"
+    except Exception as e:
+        print(f"Could not route the turn ahead of scheduling, using the conversation lane: {e}")
+        return "conversation"
+
+def record_cancellation(cancel_token: CancelToken, error: FlowCancelled) -> Dict[str, Any]:
+    """Count a cancelled flow and describe it as a failed flow result"""
+    cancellation_stats.record(cancel_token, error)
+    print(f"Flow cancelled ({error.reason}) at {error.stage}")
+    return {"success": False, "cancelled": error.reason, "error": str(error)}
+
+def cancelled_http_error(reason: str) -> HTTPException:
+    if reason == "deadline":
+        return HTTPException(status_code=504, detail="Request deadline exceeded")
+    # Nobody is listening for a disconnected client; 499 is what proxies log for it
+    return HTTPException(status_code=499, detail="Client closed request")
+
+@asynccontextmanager
+async def cancel_on_disconnect(http_request: Request, cancel_token: CancelToken):
+    """Fire `cancel_token` if the client disconnects while the body of the block runs"""
+    async def _watch():
+        while not cancel_token.cancelled:
+            if await http_request.is_disconnected():
+                cancel_token.cancel("client_disconnect")
+                return
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+    watcher = asyncio.ensure_future(_watch())
+    try:
+        yield cancel_token
+    finally:
+        watcher.cancel()
+
+def schedule_key(session_id: Optional[str], http_request: Optional[Request] = None) -> str:
+    """Fairness key for the scheduler: the session, else the client address"""
+    if session_id:
+        return session_id
+    if http_request is not None and http_request.client:
+        return http_request.client.host
+    return str(uuid.uuid4())
+
+async def run_crewai_flow(message: str, engine: Optional[str] = None, session_id: Optional[str] = None,
+                          history: Optional[List[Message]] = None, client_key: Optional[str] = None,
+                          lane: Optional[str] = None, cancel_token: Optional[CancelToken] = None,
+                          budget: Optional[LatencyBudget] = None) -> Dict[str, Any]:
+    """
+    Run a flow turn on its scheduler lane without blocking the event loop.
+
+    Unless `lane` is given, the turn is first routed on the conversation lane
+    to find out whether it belongs on the research lane. If `cancel_token`
+    fires, the flow stops at its next check point and the result carries
+    `cancelled` with the reason. A `budget` is passed on to the flow.
+    """
+    scheduler = get_scheduler()
+    client_key = client_key or schedule_key(session_id)
+    cancel_token = cancel_token or CancelToken(default_deadline())
+
+    def _route():
+        cancel_token.check("queued")
+        inputs = flow_inputs(message, engine, session_id, history)
+        return inputs, predict_lane(inputs, cancel_token, budget)
+
+    def _run_flow(inputs):
         try:
-            flow = DeepResearchFlow(tracing=False)
-            result = flow.kickoff(inputs={"user_message": message})
+            cancel_token.check("queued")
+            flow = kickoff_flow(
+                inputs or flow_inputs(message, engine, session_id, history), cancel_token=cancel_token, budget=budget
+            )
             return {
                 "success": True,
                 "data": flow.state,
-                "result": result
+                "result": flow.method_outputs[-1] if flow.method_outputs else None
             }
+        except FlowCancelled as e:
+            return record_cancellation(cancel_token, e)
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
+
+    inputs = None
+    if lane is None:
+        try:
+            inputs, lane = await scheduler.run("conversation", client_key, _route)
+        except FlowCancelled as e:
+            return record_cancellation(cancel_token, e)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    return await scheduler.run(lane, client_key, lambda: _run_flow(inputs))
+
+def build_chat_response(state) -> Message:
+    """Assistant message for a finished flow state"""
+    # Determine response based on intent
+    if state.user_intent == "research" and state.search_result:
+        # Research response with Unicode cleaning
+        try:
+            # Clean the research summary for safe JSON serialization
+            clean_summary = state.search_result.research_summary.encode('ascii', 'replace').decode('ascii')
+            sources = convert_crewai_sources_to_api(state.search_result.sources_list)
+            
+            return Message(
+                id=str(uuid.uuid4()),
+                role="assistant",
+                content=clean_summary,
+                timestamp=datetime.now(),
+                intent="research",
+                sources=sources,
+                reasoning=f"Research conducted for query: {state.research_query}",
+                partial=state.partial or None
+            )
+        except Exception as e:
+            # Fallback response if cleaning fails
+            return Message(
+                id=str(uuid.uuid4()),
+                role="assistant",
+                content="Research completed successfully. The system found relevant academic sources and generated a comprehensive summary.",
+                timestamp=datetime.now(),
+                intent="research",
+                reasoning="Research completed with encoding fallback"
+            )
+
+    # Conversation response: the reply the flow added to its history, or a generic one
+    content = "I understand your message. This appears to be a conversational request. How can I assist you further?"
+    if state.message_history and state.message_history[-1].role == "assistant":
+        content = state.message_history[-1].content
     
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(executor, _run_flow)
-    return result
+    return Message(
+        id=str(uuid.uuid4()),
+        role="assistant", 
+        content=content,
+        timestamp=datetime.now(),
+        intent="conversation",
+        reasoning="Classified as conversational interaction",
+        partial=state.partial or None
+    )
+
+def store_exchange(session_id: Optional[str], user_content: str, response: Message) -> None:
+    """Append the user message and the assistant response to a session"""
+    if not session_id:
+        return
+    
+    # Add user message
+    user_message = Message(
+        id=str(uuid.uuid4()),
+        role="user",
+        content=user_content,
+        timestamp=datetime.now()
+    )
+    
+    get_session_store().append_messages(
+        session_id, [user_message.model_dump(mode="json"), response.model_dump(mode="json")]
+    )
 
 @app.post("/api/chat")
-async def chat(request: ChatRequest) -> Message:
+async def chat(request: ChatRequest, http_request: Request) -> Message:
     """Main chat endpoint that handles user input and routes to research or conversation"""
     try:
-        # Run CrewAI flow
-        flow_result = await run_crewai_flow(request.message)
+        # Run CrewAI flow, stopping it if the client goes away or the deadline passes
+        cancel_token, budget = turn_limits(request.budgetSeconds)
+        async with cancel_on_disconnect(http_request, cancel_token):
+            flow_result = await run_crewai_flow(
+                request.message, request.engine, request.sessionId, request.history,
+                client_key=schedule_key(request.sessionId, http_request), cancel_token=cancel_token, budget=budget,
+            )
         
+        if flow_result.get("cancelled"):
+            raise cancelled_http_error(flow_result["cancelled"])
         if not flow_result["success"]:
             raise HTTPException(status_code=500, detail=flow_result["error"])
         
-        state = flow_result["data"]
-        
-        # Determine response based on intent
-        if state.user_intent == "research" and state.search_result:
-            # Research response with Unicode cleaning
-            try:
-                # Clean the research summary for safe JSON serialization
-                clean_summary = state.search_result.research_summary.encode('ascii', 'replace').decode('ascii')
-                sources = convert_crewai_sources_to_api(state.search_result.sources_list)
-                
-                response = Message(
-                    id=str(uuid.uuid4()),
-                    role="assistant",
-                    content=clean_summary,
-                    timestamp=datetime.now(),
-                    intent="research",
-                    sources=sources,
-                    reasoning=f"Research conducted for query: {state.research_query}"
-                )
-            except Exception as e:
-                # Fallback response if cleaning fails
-                response = Message(
-                    id=str(uuid.uuid4()),
-                    role="assistant",
-                    content="Research completed successfully. The system found relevant academic sources and generated a comprehensive summary.",
-                    timestamp=datetime.now(),
-                    intent="research",
-                    reasoning="Research completed with encoding fallback"
-                )
-        else:
-            # Conversation response (fallback or direct conversation)
-            # For now, use the last message from history or generate a simple response
-            content = "I understand your message. This appears to be a conversational request. How can I assist you further?"
-            
-            response = Message(
-                id=str(uuid.uuid4()),
-                role="assistant", 
-                content=content,
-                timestamp=datetime.now(),
-                intent="conversation",
-                reasoning="Classified as conversational interaction"
-            )
+        response = build_chat_response(flow_result["data"])
         
         # Store in session if sessionId provided
-        if request.sessionId:
-            if request.sessionId not in sessions:
-                sessions[request.sessionId] = ChatSession(
-                    id=request.sessionId,
-                    title="Research Session",
-                    messages=[],
-                    createdAt=datetime.now(),
-                    updatedAt=datetime.now()
-                )
-            
-            # Add user message
-            user_message = Message(
-                id=str(uuid.uuid4()),
-                role="user",
-                content=request.message,
-                timestamp=datetime.now()
-            )
-            
-            sessions[request.sessionId].messages.extend([user_message, response])
-            sessions[request.sessionId].updatedAt = datetime.now()
+        await asyncio.to_thread(store_exchange, request.sessionId, request.message, response)
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    Chat over server-sent events.
+
+    Emits `router` once the intent is known, `search_started`, `search_finished`
+    (with the source count) and one `source` per source for research, `token`
+    chunks of the summary or reply as the LLM produces them, and finally `done`
+    with the same message /api/chat returns (or `error`). Research uses the
+    direct engine unless the request asks for the agent. `partial` (with the
+    reason) announces that the latency budget ran out and the answer is
+    incomplete. The flow is cancelled when the client closes the stream or
+    the request deadline passes.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def sink(event: Optional[str], data: Optional[Dict[str, Any]]) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    scheduler = get_scheduler()
+    client_key = schedule_key(request.sessionId, http_request)
+    cancel_token, budget = turn_limits(request.budgetSeconds)
+
+    def _cancelled(e: FlowCancelled):
+        record_cancellation(cancel_token, e)
+        sink("error", {"detail": cancelled_http_error(e.reason).detail, "cancelled": e.reason})
+
+    def _run_flow(inputs):
+        try:
+            cancel_token.check("queued")
+            flow = kickoff_flow(inputs, sink, cancel_token, budget)
+            response = build_chat_response(flow.state)
+            store_exchange(request.sessionId, request.message, response)
+            sink("done", response.model_dump(mode="json"))
+        except FlowCancelled as e:
+            _cancelled(e)
+        except Exception as e:
+            sink("error", {"detail": f"Error processing chat: {str(e)}"})
+        finally:
+            sink(None, None)
+
+    def _route():
+        # Routed on the conversation lane, then handed to the lane the intent belongs on
+        try:
+            cancel_token.check("queued")
+            inputs = flow_inputs(request.message, request.engine or "direct", request.sessionId, request.history)
+            lane = predict_lane(inputs, cancel_token, budget)
+        except FlowCancelled as e:
+            _cancelled(e)
+            sink(None, None)
+            return
+        except Exception as e:
+            sink("error", {"detail": f"Error processing chat: {str(e)}"})
+            sink(None, None)
+            return
+        scheduler.submit(lane, client_key, lambda: _run_flow(inputs))
+
+    scheduler.submit("conversation", client_key, _route)
+
+    async def stream():
+        finished = False
+        try:
+            while True:
+                event, data = await events.get()
+                if event is None:
+                    finished = True
+                    break
+                yield sse_event(event, data)
+        finally:
+            # The response is torn down early when the client disconnects
+            if not finished:
+                cancel_token.cancel("client_disconnect")
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def decision_to_api(decision: Dict[str, Any]) -> IntentClassification:
+    return IntentClassification(
+        intent=decision.get("user_intent") or "conversation",
+        confidence=decision["confidence"] if decision.get("confidence") is not None else 0.85,
+        reasoning=decision.get("reasoning") or "Intent classified based on message content and context",
+        optimizedQuery=decision.get("research_query")
+    )
+
 @app.post("/api/classify-intent")
 async def classify_intent(request: ClassifyIntentRequest) -> IntentClassification:
     """Classify user intent as research or conversation"""
-    try:
+    def _classify():
         # Run just the intent classification part
         flow = DeepResearchFlow(tracing=False)
-        # Set the user message
+        # Same history and message as the chat turn, so the router cache key matches /api/chat
+        flow.state.message_history = [
+            CrewAIMessage(role=item.role, content=item.content, timestamp=item.timestamp.isoformat())
+            for item in request.history or []
+        ]
         flow.state.user_message = request.message
+        flow.add_message("user", request.message)
         
-        # Run the routing method
-        intent_result = flow.routing_intent()
-        
-        return IntentClassification(
-            intent=flow.state.user_intent,
-            confidence=0.85,  # Mock confidence score
-            reasoning="Intent classified based on message content and context",
-            optimizedQuery=flow.state.research_query
-        )
+        # Route without going through the persisted flow method
+        flow.decide_intent()
+        return {
+            "user_intent": flow.state.user_intent,
+            "confidence": flow.state.intent_confidence,
+            "reasoning": flow.state.intent_reasoning,
+            "research_query": flow.state.research_query,
+        }
+
+    try:
+        # The router may call the LLM, so keep it off the event loop
+        return decision_to_api(await asyncio.to_thread(_classify))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error classifying intent: {str(e)}")
 
+@app.post("/api/classify-intent/batch")
+async def classify_intent_batch(request: ClassifyIntentBatchRequest) -> List[IntentClassification]:
+    """Classify many standalone messages, several per router LLM call"""
+    if len(request.messages) > MAX_BATCH_CLASSIFY:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_CLASSIFY} messages per batch")
+    try:
+        decisions = await asyncio.to_thread(classify_messages, request.messages, request.chunkSize)
+        return [decision_to_api(decision) for decision in decisions]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error classifying intents: {str(e)}")
+
+def build_research_result(query: str, state) -> ResearchResult:
+    """API research result for a finished flow state"""
+    sources = convert_crewai_sources_to_api(state.search_result.sources_list)
+    
+    return ResearchResult(
+        query=query,
+        summary=state.search_result.research_summary,
+        sources=sources,
+        topics=["research", "analysis", "findings"],  # Could be enhanced
+        partial=state.partial
+    )
+
 @app.post("/api/research")
-async def research(request: ResearchRequest) -> ResearchResult:
+async def research(request: ResearchRequest, http_request: Request) -> ResearchResult:
     """Conduct research for a specific query"""
     try:
-        flow_result = await run_crewai_flow(request.query)
+        cancel_token, budget = turn_limits(request.budgetSeconds)
+        async with cancel_on_disconnect(http_request, cancel_token):
+            run = lambda: run_crewai_flow(
+                request.query, request.engine, client_key=schedule_key(None, http_request),
+                lane="research", cancel_token=cancel_token, budget=budget,
+            )
+            # Identical concurrent requests (with the same budget) share one flow run
+            flow_result, shared = await research_request_flights.ado(
+                (normalize_query(request.query), request.engine, request.budgetSeconds), run
+            )
+            if flow_result.get("cancelled") and shared and not cancel_token.cancelled:
+                # The request this one was sharing with went away; this client is still waiting
+                flow_result = await run()
         
+        if flow_result.get("cancelled"):
+            raise cancelled_http_error(flow_result["cancelled"])
         if not flow_result["success"]:
             raise HTTPException(status_code=500, detail=flow_result["error"])
         
@@ -256,18 +601,82 @@ async def research(request: ResearchRequest) -> ResearchResult:
         if not state.search_result:
             raise HTTPException(status_code=404, detail="No research results found")
         
-        sources = convert_crewai_sources_to_api(state.search_result.sources_list)
-        
-        return ResearchResult(
-            query=request.query,
-            summary=state.search_result.research_summary,
-            sources=sources,
-            topics=["research", "analysis", "findings"]  # Could be enhanced
-        )
+        return build_research_result(request.query, state)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error conducting research: {str(e)}")
 
+def run_research_job(job: Job) -> Dict[str, Any]:
+    """Run a research flow for a queued job, reporting each stage as job progress"""
+    def sink(event: str, data: Dict[str, Any]) -> None:
+        if event == "router":
+            job.update_progress(stage="routed", researchQuery=data.get("research_query"))
+        elif event == "search_started":
+            job.update_progress(stage="searching")
+        elif event == "search_finished":
+            job.update_progress(stage="synthesizing", sourceCount=data.get("source_count"))
+
+    cancel_token, budget = turn_limits(job.params.get("budget_seconds"))
+    try:
+        flow = kickoff_flow(flow_inputs(job.params["query"], job.params.get("engine")), sink, cancel_token, budget)
+    except FlowCancelled as e:
+        # Count the cancellation and report it as a failed job
+        raise RuntimeError(record_cancellation(cancel_token, e)["error"])
+
+    if not flow.state.search_result:
+        raise RuntimeError("No research results found")
+    return build_research_result(job.params["query"], flow.state).model_dump(mode="json")
+
+def job_to_api(job: Job) -> ResearchJob:
+    snapshot = job.snapshot()
+    to_datetime = lambda value: datetime.fromtimestamp(value) if value else None
+    return ResearchJob(
+        id=snapshot["id"],
+        status=snapshot["status"],
+        progress=snapshot["progress"],
+        result=snapshot["result"],
+        error=snapshot["error"],
+        createdAt=to_datetime(snapshot["created_at"]),
+        startedAt=to_datetime(snapshot["started_at"]),
+        finishedAt=to_datetime(snapshot["finished_at"]),
+    )
+
+@app.post("/api/research/jobs", status_code=202)
+async def submit_research_job(request: ResearchRequest) -> ResearchJob:
+    """Queue a research request and return its job id immediately"""
+    try:
+        job = get_job_queue().submit(
+            run_research_job, kind="research", query=request.query, engine=request.engine,
+            budget_seconds=request.budgetSeconds,
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return job_to_api(job)
+
+@app.get("/api/research/jobs/{job_id}")
+async def get_research_job(job_id: str) -> ResearchJob:
+    """Status, progress and (once finished) the result of a research job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_api(job)
+
+@app.post("/api/search")
+async def search(request: SearchRequest, http_request: Request) -> Dict[str, Any]:
+    """Run a raw paper search on the event loop without occupying an executor thread"""
+    cancel_token, budget = turn_limits(request.budgetSeconds)
+    try:
+        async with cancel_on_disconnect(http_request, cancel_token):
+            with cancel_scope(cancel_token), budget_scope(budget):
+                result = await DeepResearchPaper()._arun(query=request.query)
+    except FlowCancelled as e:
+        raise cancelled_http_error(record_cancellation(cancel_token, e)["cancelled"])
+    if isinstance(result, str):
+        raise HTTPException(status_code=502, detail=result)
+    return result
+
 @app.post("/api/conversation") 
 async def conversation(request: ConversationRequest) -> Dict[str, str]:
     """Handle conversational interactions"""
@@ -288,47 +697,63 @@ async def conversation(request: ConversationRequest) -> Dict[str, str]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in conversation: {str(e)}")
 
+def session_to_api(session: Dict[str, Any], limit: int = 50) -> ChatSession:
+    """A session with its newest page of messages; older ones are paged from /messages"""
+    store = get_session_store()
+    messages, next_cursor = store.list_messages(session["id"], limit=limit)
+    return ChatSession(
+        id=session["id"],
+        title=session["title"],
+        messages=messages,
+        createdAt=session["createdAt"],
+        updatedAt=session["updatedAt"],
+        messageCount=store.count_messages(session["id"]),
+        nextCursor=next_cursor
+    )
+
 @app.get("/api/sessions/{session_id}")
-async def get_session(session_id: str) -> ChatSession:
-    """Get a chat session"""
-    if session_id not in sessions:
+async def get_session(session_id: str, limit: int = Query(50, ge=1, le=500)) -> ChatSession:
+    """Get a chat session with its most recent messages"""
+    session = await asyncio.to_thread(get_session_store().get_session, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return sessions[session_id]
+    return await asyncio.to_thread(session_to_api, session, limit)
 
 @app.post("/api/sessions/{session_id}")
 async def create_session(session_id: str) -> ChatSession:
     """Create a new chat session"""
-    session = ChatSession(
-        id=session_id,
-        title="Research Session",
+    session = await asyncio.to_thread(get_session_store().create_session, session_id)
+    return ChatSession(
+        id=session["id"],
+        title=session["title"],
         messages=[],
-        createdAt=datetime.now(),
-        updatedAt=datetime.now()
+        createdAt=session["createdAt"],
+        updatedAt=session["updatedAt"],
+        messageCount=0
     )
-    sessions[session_id] = session
-    return session
 
 @app.get("/api/sessions/{session_id}/messages")
-async def get_messages(session_id: str) -> List[Message]:
-    """Get messages for a session"""
-    if session_id not in sessions:
+async def get_messages(
+    session_id: str,
+    cursor: Optional[str] = Query(None, pattern=r"^\d+$"),
+    limit: int = Query(50, ge=1, le=500),
+) -> MessagesPage:
+    """
+    Page through a session's messages, newest first.
+
+    Each page is in chronological order; pass its `nextCursor` as `cursor`
+    to get the page before it. `nextCursor` is null on the oldest page.
+    """
+    store = get_session_store()
+    if await asyncio.to_thread(store.get_session, session_id) is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return sessions[session_id].messages
+    messages, next_cursor = await asyncio.to_thread(store.list_messages, session_id, cursor, limit)
+    return MessagesPage(messages=messages, nextCursor=next_cursor)
 
 @app.post("/api/sessions/{session_id}/messages")
 async def add_message(session_id: str, message: Message) -> Message:
     """Add a message to a session"""
-    if session_id not in sessions:
-        sessions[session_id] = ChatSession(
-            id=session_id,
-            title="Research Session",
-            messages=[],
-            createdAt=datetime.now(),
-            updatedAt=datetime.now()
-        )
-    
-    sessions[session_id].messages.append(message)
-    sessions[session_id].updatedAt = datetime.now()
+    await asyncio.to_thread(get_session_store().append_messages, session_id, [message.model_dump(mode="json")])
     return message
 
 @app.get("/health")
@@ -336,6 +761,32 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now()}
 
+@app.get("/api/metrics")
+async def metrics() -> Dict[str, Any]:
+    """Runtime counters for the research pipeline"""
+    return {
+        "search_cache": get_search_cache().stats(),
+        "http_pool": get_http_client().stats(),
+        "firecrawl_resilience": get_resilient_caller().stats(),
+        "corpus_index": get_corpus_index().stats(),
+        "source_dedup": dedup_stats.snapshot(),
+        "router_fast_path": get_intent_classifier().stats(),
+        "router_cache": get_router_cache().stats(),
+        "research_prefetch": prefetch_stats.snapshot(),
+        "research_engines": research_engine_stats.snapshot(),
+        "object_registry": registry_stats(),
+        "research_jobs": get_job_queue().stats(),
+        "research_coalescing": {
+            "research_requests": research_request_flights.stats(),
+            "research_runs": research_flights.stats(),
+        },
+        "session_store": get_session_store().stats(),
+        "scheduler_lanes": get_scheduler().stats(),
+        "cancellation": cancellation_stats.snapshot(),
+        "latency_budgets": budget_stats.snapshot(),
+        "flow_persistence": getattr(get_flow_persistence(), "stats", dict)(),
+    }
+
 # Mount static files for frontend (production deployment)
 static_dir = Path(__file__).parent.parent.parent / "frontend" / "dist"
 if static_dir.exists():
@@ -0,0 +1,137 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+from crewai_flow_workshop1.intent_classifier import get_intent_classifier
+from crewai_flow_workshop1.main import DeepResearchFlow
+from crewai_flow_workshop1.registry import get_llm
+from crewai_flow_workshop1.router_cache import get_router_cache
+from crewai_flow_workshop1.tools.search_cache import normalize_query
+
+
+class BatchRouterItem(BaseModel):
+    index: int
+    user_intent: Literal["research", "conversation"]
+    research_query: Optional[str] = None
+    reasoning: str
+    confidence: Optional[float] = None
+
+
+class BatchRouterIntent(BaseModel):
+    items: List[BatchRouterItem]
+
+
+def classify_chunk(messages: List[str]) -> Dict[int, Dict[str, Any]]:
+    """Classify several standalone messages with one router LLM call; keyed by position in `messages`."""
+    llm = get_llm("gpt-4.1-mini", temperature=0.1, response_format=BatchRouterIntent)
+    numbered = "\n".join(f"[{index}] {json.dumps(message)}" for index, message in enumerate(messages))
+
+    prompt = f"""
+        === TASK ===
+        You are an intelligent router. Classify EACH numbered user message below independently.
+
+        **RESEARCH**: asks for factual information, studies, papers, market trends or in-depth analysis that needs external research.
+        **CONVERSATION**: greetings, small talk, simple clarifications, questions about the assistant itself.
+
+        === MESSAGES ===
+        {numbered}
+
+        === OUTPUT REQUIREMENTS ===
+        Return one item per message with:
+        1. **index**: the message number in brackets
+        2. **user_intent**: "research" or "conversation"
+        3. **research_query**: a specific, actionable research query for research messages, otherwise null
+        4. **reasoning**: one short sentence
+        5. **confidence**: from 0.0 to 1.0"""
+
+    response = llm.call(prompt)
+    if not isinstance(response, str):
+        return {}
+    items = BatchRouterIntent.model_validate_json(response).items
+    return {item.index: item.model_dump(exclude={"index"}) for item in items if 0 <= item.index < len(messages)}
+
+
+def classify_single(message: str) -> Optional[Dict[str, Any]]:
+    """Per-message router call, used for messages a batch response left out."""
+    flow = DeepResearchFlow(tracing=False)
+    flow.state.user_message = message
+    try:
+        return flow.classify_with_llm()
+    except Exception as e:
+        print(f"Router call failed for a batch message: {e}")
+        return None
+
+
+def classify_messages(messages: List[str], chunk_size: Optional[int] = None, concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Classify many standalone messages (no conversation history).
+
+    Each message is tried against the local fast path and the router cache
+    first; the rest are deduplicated and go to the LLM `chunk_size` messages
+    per call, with up to `concurrency` calls in flight, including per-message
+    calls for anything a batch call left out. LLM decisions are cached and
+    logged for training like single-message decisions. Results keep the input order and
+    carry the deciding `method` (rule, model, cache, llm_batch or llm).
+    """
+    chunk_size = chunk_size or int(os.getenv("ROUTER_BATCH_SIZE", "20"))
+    concurrency = concurrency or int(os.getenv("ROUTER_BATCH_CONCURRENCY", "4"))
+    classifier = get_intent_classifier()
+    cache = get_router_cache()
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    # Identical messages (as the router cache sees them) are classified once and share the decision
+    pending: Dict[str, List[int]] = {}
+    for position, message in enumerate(messages):
+        fast_intent = classifier.classify(message)
+        if fast_intent is not None:
+            results[position] = fast_intent.model_dump()
+            continue
+        cached = cache.get(message, [])
+        if cached is not None:
+            results[position] = {**cached, "method": "cache"}
+            continue
+        pending.setdefault(normalize_query(message), []).append(position)
+
+    unique = [positions[0] for positions in pending.values()]
+    chunks = [unique[start:start + chunk_size] for start in range(0, len(unique), chunk_size)]
+    decided: Dict[int, Tuple[Dict[str, Any], str]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        chunk_results = list(pool.map(lambda chunk: _classify_chunk_safely([messages[p] for p in chunk]), chunks))
+        fallback: List[int] = []
+        for chunk, decisions in zip(chunks, chunk_results):
+            for offset, position in enumerate(chunk):
+                if offset in decisions:
+                    decided[position] = (decisions[offset], "llm_batch")
+                else:
+                    fallback.append(position)
+        # Messages a batch left out go one per call, still at most `concurrency` at a time
+        for position, decision in zip(fallback, pool.map(lambda p: classify_single(messages[p]), fallback)):
+            if decision is not None:
+                decided[position] = (decision, "llm")
+
+    for positions in pending.values():
+        if positions[0] not in decided:
+            continue
+        decision, method = decided[positions[0]]
+        message = messages[positions[0]]
+        if method == "llm_batch":
+            classifier.log_decision(message, decision)
+            if decision.get("confidence") is None:
+                decision["confidence"] = classifier.confidence_for(message, decision.get("user_intent"))
+        cache.set(message, [], decision)
+        for position in positions:
+            results[position] = {**decision, "method": method}
+
+    return [result or {"user_intent": "conversation", "research_query": None, "confidence": 0.0,
+                       "reasoning": "Could not be classified", "method": "unclassified"} for result in results]
+
+
+def _classify_chunk_safely(messages: List[str]) -> Dict[int, Dict[str, Any]]:
+    try:
+        return classify_chunk(messages)
+    except Exception as e:
+        print(f"Batch router call failed for {len(messages)} messages, classifying them one by one: {e}")
+        return {}
@@ -0,0 +1,160 @@
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallStartedEvent
+
+_current_budget: ContextVar[Optional["LatencyBudget"]] = ContextVar("latency_budget", default=None)
+
+
+class BudgetExhausted(BaseException):
+    """
+    Raised before an LLM call when the latency budget cannot fit another one.
+
+    A BaseException so crewAI's agent loop does not retry it; the flow catches
+    it and answers with what it has gathered so far.
+    """
+
+    def __init__(self, stage: str):
+        super().__init__(f"Latency budget exhausted at {stage}")
+        self.stage = stage
+
+
+def min_llm_seconds() -> float:
+    """Least time worth starting an LLM call with (BUDGET_MIN_LLM_SECONDS)."""
+    return float(os.getenv("BUDGET_MIN_LLM_SECONDS", "2"))
+
+
+class LatencyBudget:
+    """
+    End-to-end time allowance for one request.
+
+    Unlike a CancelToken deadline, running out is not an error: stages shrink
+    their timeouts and iteration limits to fit, skip optional LLM calls, and
+    the flow returns partial results. Search results gathered under the budget
+    are kept in `results` for that fallback.
+    """
+
+    def __init__(self, seconds: float, results: Optional[List[Any]] = None):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.results: List[Any] = results if results is not None else []
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """True when `seconds` of work still fit in the budget."""
+        return self.remaining() >= seconds
+
+    def reserve(self, seconds: float) -> "LatencyBudget":
+        """A budget that ends `seconds` earlier, e.g. to keep time for a final synthesis; shares `results`."""
+        return LatencyBudget(self.remaining() - seconds, results=self.results)
+
+    def timeout(self, default: float) -> float:
+        """`default`, shortened to what is left of the budget (at least a second)."""
+        return max(1.0, min(default, self.remaining()))
+
+    def llm_timeout(self) -> int:
+        """
+        LLM request timeout that fits the budget.
+
+        Rounded down to a power of two so the shared LLM registry only ever
+        holds a handful of clients per configuration.
+        """
+        return 2 ** int(math.log2(max(self.remaining(), 1.0)))
+
+    def max_iterations(self, default: int) -> int:
+        """Agent iteration limit that fits the budget, at BUDGET_SECONDS_PER_AGENT_ITERATION per iteration."""
+        per_iteration = float(os.getenv("BUDGET_SECONDS_PER_AGENT_ITERATION", "6"))
+        return max(1, min(default, int(self.remaining() / per_iteration)))
+
+    def check(self, stage: str) -> None:
+        if not self.allows(min_llm_seconds()):
+            raise BudgetExhausted(stage)
+
+
+class BudgetStats:
+    """Counters for requests with a latency budget and how they degraded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Any] = {"budgeted_turns": 0, "router_llm_skipped": 0, "partial_results": 0, "by_reason": {}}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def record_partial(self, reason: str) -> None:
+        with self._lock:
+            self._counters["partial_results"] += 1
+            self._counters["by_reason"][reason] = self._counters["by_reason"].get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {**self._counters, "by_reason": dict(self._counters["by_reason"])}
+        snapshot["partial_ratio"] = (
+            snapshot["partial_results"] / snapshot["budgeted_turns"] if snapshot["budgeted_turns"] else 0.0
+        )
+        return snapshot
+
+
+budget_stats = BudgetStats()
+
+
+def default_budget() -> Optional[float]:
+    """Latency budget in seconds for requests that do not set one (LATENCY_BUDGET_SECONDS), or None."""
+    value = float(os.getenv("LATENCY_BUDGET_SECONDS") or 0)
+    return value if value > 0 else None
+
+
+@contextmanager
+def budget_scope(budget: Optional[LatencyBudget]) -> Iterator[None]:
+    """
+    Apply `budget` to crewAI LLM calls and research tool calls made by this thread or task.
+
+    Every LLM call (so every agent iteration) first checks that the budget can
+    still fit one, and the search tool sizes its HTTP timeouts from it. Like
+    the cancel scope, it lives in a context variable so it also follows
+    asyncio tasks.
+    """
+    reset = _current_budget.set(budget)
+    try:
+        yield
+    finally:
+        _current_budget.reset(reset)
+
+
+def current_budget() -> Optional[LatencyBudget]:
+    return _current_budget.get()
+
+
+def budget_bound(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` to run under the calling thread's budget, for work handed to pool threads."""
+    budget = current_budget()
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with budget_scope(budget):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _check_before_llm_call(source: Any, event: LLMCallStartedEvent) -> None:
+    budget = current_budget()
+    if budget is not None:
+        budget.check("llm_call")
+
+
+crewai_event_bus.register_handler(LLMCallStartedEvent, _check_before_llm_call)
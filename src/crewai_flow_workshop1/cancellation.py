@@ -0,0 +1,169 @@
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallStartedEvent
+from crewai.events.types.tool_usage_events import ToolUsageStartedEvent
+
+_current_token: ContextVar[Optional["CancelToken"]] = ContextVar("cancel_token", default=None)
+
+
+class FlowCancelled(BaseException):
+    """
+    Raised inside a flow once its CancelToken has fired.
+
+    A BaseException, like asyncio.CancelledError, so the broad `except Exception`
+    blocks in the flow, crewAI's agent loop and the tools do not swallow it.
+    """
+
+    def __init__(self, reason: str, stage: str):
+        super().__init__(f"Flow cancelled ({reason}) at {stage}")
+        self.reason = reason
+        self.stage = stage
+
+
+class CancelToken:
+    """
+    Cooperative cancellation signal for one flow run.
+
+    Fired explicitly with `cancel(reason)` (e.g. the client disconnected) or
+    implicitly once `deadline_seconds` have passed. A token with a `parent`
+    also fires with it, so side work of a flow can be stopped on its own or
+    together with the flow. Work polls it at safe points with `check(stage)`,
+    which raises FlowCancelled.
+    """
+
+    def __init__(self, deadline_seconds: Optional[float] = None, parent: Optional["CancelToken"] = None):
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[float] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Fire the token; returns False if it had already fired."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set():
+            if self.parent is not None and self.parent.cancelled:
+                self.cancel(self.parent.reason or "cancelled")
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel("deadline")
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (or the parent's, if sooner), or None without one."""
+        remaining = max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None
+        parent_remaining = self.parent.remaining() if self.parent is not None else None
+        if remaining is None or parent_remaining is None:
+            return remaining if parent_remaining is None else parent_remaining
+        return min(remaining, parent_remaining)
+
+    def check(self, stage: str) -> None:
+        if self.cancelled:
+            raise FlowCancelled(self.reason or "cancelled", stage)
+
+
+class CancellationStats:
+    """Counters for flows stopped early, by reason and by the stage they stopped at."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Any] = {"cancelled": 0, "by_reason": {}, "by_stage": {}}
+        self._stop_latencies: Deque[float] = deque(maxlen=500)
+
+    def record(self, token: CancelToken, error: FlowCancelled) -> None:
+        with self._lock:
+            self._counters["cancelled"] += 1
+            for group, name in (("by_reason", error.reason), ("by_stage", error.stage)):
+                self._counters[group][name] = self._counters[group].get(name, 0) + 1
+            if token.cancelled_at is not None:
+                self._stop_latencies.append(time.monotonic() - token.cancelled_at)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                "cancelled": self._counters["cancelled"],
+                "by_reason": dict(self._counters["by_reason"]),
+                "by_stage": dict(self._counters["by_stage"]),
+            }
+            latencies = list(self._stop_latencies)
+        # How long work kept running between the signal and the next check point
+        snapshot["stop_latency_mean_seconds"] = sum(latencies) / len(latencies) if latencies else 0.0
+        return snapshot
+
+
+cancellation_stats = CancellationStats()
+
+
+def default_deadline() -> Optional[float]:
+    """Server-wide hard deadline for a request in seconds (REQUEST_DEADLINE_SECONDS), or None."""
+    value = float(os.getenv("REQUEST_DEADLINE_SECONDS") or 0)
+    return value if value > 0 else None
+
+
+@contextmanager
+def cancel_scope(token: Optional[CancelToken]) -> Iterator[None]:
+    """
+    Check `token` before every crewAI LLM call and tool use made by this thread or task.
+
+    crewAI publishes both on its global event bus from the calling thread, so
+    this covers each agent iteration and tool call without touching the agent
+    loop. The token lives in a context variable, which keeps concurrent flows
+    apart both across threads and across tasks on one event loop.
+    """
+    reset = _current_token.set(token)
+    try:
+        yield
+    finally:
+        _current_token.reset(reset)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current_token.get()
+
+
+def cancel_bound(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` to run under the calling thread's cancel token, for work handed to pool threads."""
+    token = current_token()
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with cancel_scope(token):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def check_cancelled(stage: str) -> None:
+    """Raise FlowCancelled if the token of the current cancel_scope has fired."""
+    token = current_token()
+    if token is not None:
+        token.check(stage)
+
+
+def _check_before_llm_call(source: Any, event: LLMCallStartedEvent) -> None:
+    check_cancelled("llm_call")
+
+
+def _check_before_tool_use(source: Any, event: ToolUsageStartedEvent) -> None:
+    check_cancelled("tool_call")
+
+
+crewai_event_bus.register_handler(LLMCallStartedEvent, _check_before_llm_call)
+crewai_event_bus.register_handler(ToolUsageStartedEvent, _check_before_tool_use)
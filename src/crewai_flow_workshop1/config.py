@@ -0,0 +1,24 @@
+import os
+from pathlib import Path
+
+from crewai.utilities.paths import db_storage_path
+
+
+def data_path(filename: str) -> Path:
+    """
+    Resolve a file inside the project's local data directory.
+
+    Uses CREWAI_FLOW_DATA_DIR when set, otherwise the same directory CrewAI
+    uses for @persist flow states, so everything survives a server restart.
+    """
+    base_dir = Path(os.getenv("CREWAI_FLOW_DATA_DIR") or db_storage_path())
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return base_dir / filename
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean feature flag such as DEEP_RESEARCH_CACHE_BYPASS=true from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
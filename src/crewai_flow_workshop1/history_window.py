@@ -0,0 +1,119 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai_flow_workshop1.cancellation import FlowCancelled
+from crewai_flow_workshop1.registry import get_llm
+from crewai_flow_workshop1.tools.compaction import estimate_tokens, trim
+
+
+class HistoryWindow:
+    """
+    Compact, token-budgeted view of a conversation for prompts.
+
+    The newest `max_turns` messages are rendered verbatim (each capped at
+    `message_max_chars`) within `max_tokens`; everything older is folded into
+    a rolling summary of at most `summary_max_tokens`. The summary is extended
+    only once `summary_batch` messages have fallen out of the window, so the
+    summary LLM call runs every few turns instead of on every reply; until
+    then those messages stay in the rendered window.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 6,
+        max_tokens: int = 800,
+        summary_max_tokens: int = 300,
+        message_max_chars: int = 600,
+        summary_model: Optional[str] = "gpt-4.1-mini",
+        summary_batch: int = 6,
+    ):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.message_max_chars = message_max_chars
+        self.summary_model = summary_model
+        self.summary_batch = max(summary_batch, 1)
+
+    def _line(self, message: Any) -> str:
+        return f"{message.role}: {trim(' '.join(message.content.split()), self.message_max_chars)}"
+
+    def render(self, messages: List[Any], summary: str = "", exclude_message: Optional[str] = None,
+               summarized_count: Optional[int] = None) -> str:
+        """Serialize the summary plus the newest unsummarized turns that fit the token budget."""
+        # Messages waiting for the next fold are not in the summary yet, so they stay in the window
+        recent = messages[summarized_count:] if summarized_count is not None else messages[-self.max_turns:]
+        if recent and exclude_message is not None and recent[-1].content == exclude_message:
+            recent = recent[:-1]
+
+        budget = self.max_tokens
+        lines: List[str] = []
+        for message in reversed(recent):
+            line = self._line(message)
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation: {summary}")
+        parts.extend(lines)
+        return "\n".join(parts) if parts else "(no previous messages)"
+
+    def pending(self, messages: List[Any], summarized_count: int) -> Tuple[List[Any], int]:
+        """Messages to fold once a full batch has left the window, and the new summarized count."""
+        cutoff = max(len(messages) - self.max_turns, 0)
+        if cutoff - summarized_count < self.summary_batch:
+            return [], summarized_count
+        return messages[summarized_count:cutoff], cutoff
+
+    def fold(self, summary: str, new_messages: List[Any], use_llm: bool = True,
+             llm_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Extend the rolling summary with messages that just left the window.
+
+        Without `use_llm` (or if the summary call fails or is cancelled) the
+        messages are appended extractively instead.
+        """
+        if not new_messages:
+            return summary
+        transcript = "\n".join(self._line(message) for message in new_messages)
+        if self.summary_model and use_llm:
+            try:
+                llm = get_llm(self.summary_model, temperature=0.0, **(llm_options or {}))
+                updated = llm.call(
+                    f"""Update the running summary of a research assistant conversation.
+Keep the topics researched, questions asked, key findings and user preferences.
+Write at most {self.summary_max_tokens * 3} characters of plain prose.
+
+Current summary:
+{summary or "(empty)"}
+
+New messages to fold in:
+{transcript}
+
+Updated summary:"""
+                )
+                if isinstance(updated, str) and updated.strip():
+                    return trim(" ".join(updated.split()), self.summary_max_tokens * 4)
+            except (Exception, FlowCancelled) as e:
+                print(f"History summary update failed, using extractive fallback: {e}")
+
+        # Extractive fallback: append the trimmed lines and keep the most recent part within budget
+        combined = f"{summary} {' | '.join(self._line(message) for message in new_messages)}".strip()
+        limit = self.summary_max_tokens * 4
+        return combined if len(combined) <= limit else "..." + combined[-(limit - 3):]
+
+
+def get_history_window() -> HistoryWindow:
+    """Build the history window from environment variables."""
+    return HistoryWindow(
+        max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+        max_tokens=int(os.getenv("HISTORY_MAX_TOKENS", "800")),
+        summary_max_tokens=int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "300")),
+        message_max_chars=int(os.getenv("HISTORY_MESSAGE_MAX_CHARS", "600")),
+        summary_model=os.getenv("HISTORY_SUMMARY_MODEL", "gpt-4.1-mini") or None,
+        summary_batch=int(os.getenv("HISTORY_SUMMARY_BATCH", "6")),
+    )
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+"""
+Local fast-path intent classifier that runs before the router LLM.
+
+Obvious messages ("hi", "thanks", "find papers on X") are decided instantly
+by keyword rules or by a small hashed-feature logistic regression trained on
+logged router decisions; everything else falls through to the LLM.
+
+Retrain from the decision log with:
+
+    python -m crewai_flow_workshop1.intent_classifier
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from crewai_flow_workshop1.config import data_path
+
+CONVERSATION_PATTERNS = [
+    r"(hi|hello|hey|yo|hiya|howdy)( there)?",
+    r"good (morning|afternoon|evening|night)",
+    r"(thanks|thank you|thx|ty)( (so|very) much)?( for (that|this|the help|your help))?",
+    r"(bye|goodbye|see you|see ya|later|cheers)",
+    r"how are you( doing)?( today)?",
+    r"who are you|what can you do|what are you|help",
+]
+# Bare acknowledgements are small talk on their own, but after an answer they may accept an offer ("more papers?" "yes")
+ACKNOWLEDGEMENT_PATTERNS = [
+    r"(ok|okay|k|cool|great|nice|awesome|perfect|got it|sounds good|sure|yes|no|yep|nope)",
+]
+_CONVERSATION_RE = re.compile(r"^\s*(" + "|".join(CONVERSATION_PATTERNS) + r")[\s!.?,:)]*$", re.IGNORECASE)
+_ACKNOWLEDGEMENT_RE = re.compile(r"^\s*(" + "|".join(ACKNOWLEDGEMENT_PATTERNS) + r")[\s!.?,:)]*$", re.IGNORECASE)
+
+_RESEARCH_RE = re.compile(
+    r"\b(papers?|studies|study|research|literature|arxiv|pubmed|peer[- ]reviewed|publications?|"
+    r"meta[- ]analys[ie]s|systematic review|state of the art|sota|benchmarks?)\b",
+    re.IGNORECASE,
+)
+_RESEARCH_VERB_RE = re.compile(
+    r"\b(find|search|look up|research|investigate|survey|summari[sz]e|review|what does the research|"
+    r"what are the latest|latest (developments|advances|findings|trends))\b",
+    re.IGNORECASE,
+)
+# Follow-ups ("more on that") need the conversation context only the LLM sees
+_CONTEXT_DEPENDENT_RE = re.compile(r"\b(that|this|it|them|those|these|more|above|previous|again)\b", re.IGNORECASE)
+
+
+class FastIntent(BaseModel):
+    user_intent: str
+    research_query: Optional[str] = None
+    reasoning: str
+    confidence: float
+    method: str
+
+
+def _features(message: str, dimensions: int) -> Dict[int, float]:
+    """Hashed unigram and bigram counts, L2-normalized, plus a bias feature."""
+    tokens = re.findall(r"[a-z0-9']+", message.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    grams.append(f"__len_{min(len(tokens), 20) // 4}")
+    counts: Dict[int, float] = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode("utf-8")) % dimensions
+        counts[index] = counts.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    features = {index: value / norm for index, value in counts.items()}
+    features[dimensions] = 1.0
+    return features
+
+
+class HashedLogisticModel:
+    """Binary logistic regression over hashed n-gram features; predicts P(research)."""
+
+    def __init__(self, dimensions: int = 1 << 18):
+        self.dimensions = dimensions
+        self.weights: Dict[int, float] = {}
+        self.trained_examples = 0
+
+    def predict(self, message: str) -> float:
+        score = sum(self.weights.get(i, 0.0) * v for i, v in _features(message, self.dimensions).items())
+        return 1.0 / (1.0 + math.exp(-max(min(score, 30.0), -30.0)))
+
+    def fit(self, examples: List[Tuple[str, int]], epochs: int = 8, learning_rate: float = 0.5, l2: float = 1e-4) -> None:
+        """Plain SGD on log-loss; `examples` are (message, 1 for research / 0 for conversation)."""
+        self.weights = {}
+        rng = random.Random(13)
+        examples = list(examples)
+        for epoch in range(epochs):
+            rng.shuffle(examples)
+            rate = learning_rate / (1 + epoch)
+            for message, label in examples:
+                features = _features(message, self.dimensions)
+                error = self.predict(message) - label
+                for index, value in features.items():
+                    weight = self.weights.get(index, 0.0)
+                    self.weights[index] = weight - rate * (error * value + l2 * weight)
+        self.trained_examples = len(examples)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"dimensions": self.dimensions, "trained_examples": self.trained_examples,
+                       "weights": {str(k): v for k, v in self.weights.items() if abs(v) > 1e-6}}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HashedLogisticModel":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        model = cls(dimensions=data["dimensions"])
+        model.weights = {int(k): v for k, v in data["weights"].items()}
+        model.trained_examples = data.get("trained_examples", 0)
+        return model
+
+
+class IntentClassifier:
+    """
+    Keyword rules plus an optional trained model in front of the router LLM.
+
+    `classify` returns a FastIntent when it is at least `threshold` confident
+    and None otherwise, in which case the caller should ask the LLM and pass
+    the LLM's decision to `log_decision` so the model can be retrained.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, log_path: Optional[str] = None, threshold: float = 0.9):
+        self.model_path = str(model_path or data_path("router_model.json"))
+        self.log_path = str(log_path or data_path("router_decisions.jsonl"))
+        self.threshold = threshold
+        self.model: Optional[HashedLogisticModel] = None
+        if os.path.exists(self.model_path):
+            self.model = HashedLogisticModel.load(self.model_path)
+        self._lock = threading.Lock()
+        self._counters = {"messages": 0, "rule_decisions": 0, "model_decisions": 0, "llm_fallbacks": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def classify(self, message: str, has_history: bool = False) -> Optional[FastIntent]:
+        self._count("messages")
+        text = message.strip()
+
+        if _ACKNOWLEDGEMENT_RE.match(text):
+            if has_history:
+                # Only the LLM sees what is being acknowledged
+                self._count("llm_fallbacks")
+                return None
+            self._count("rule_decisions")
+            return FastIntent(user_intent="conversation", reasoning="Acknowledgement without a conversation",
+                              confidence=0.97, method="rule")
+
+        if _CONVERSATION_RE.match(text):
+            self._count("rule_decisions")
+            return FastIntent(user_intent="conversation", reasoning="Greeting, thanks or small talk",
+                              confidence=0.97, method="rule")
+
+        self_contained = not (has_history and _CONTEXT_DEPENDENT_RE.search(text))
+        if self_contained and _RESEARCH_RE.search(text) and _RESEARCH_VERB_RE.search(text) and len(text.split()) >= 4:
+            self._count("rule_decisions")
+            return FastIntent(user_intent="research", research_query=text,
+                              reasoning="Explicit request to find research material", confidence=0.93, method="rule")
+
+        if self.model is not None:
+            probability = self.model.predict(text)
+            if probability >= self.threshold and self_contained:
+                self._count("model_decisions")
+                return FastIntent(user_intent="research", research_query=text, confidence=probability,
+                                  reasoning="Local model: research request", method="model")
+            if 1 - probability >= self.threshold:
+                self._count("model_decisions")
+                return FastIntent(user_intent="conversation", confidence=1 - probability,
+                                  reasoning="Local model: conversational message", method="model")
+
+        self._count("llm_fallbacks")
+        return None
+
+    def looks_like_research(self, message: str) -> bool:
+        """Cheap, permissive check used to decide whether a speculative search is worth starting."""
+        text = message.strip()
+        if _CONVERSATION_RE.match(text) or _ACKNOWLEDGEMENT_RE.match(text) or len(text.split()) < 3:
+            return False
+        if _RESEARCH_RE.search(text) or _RESEARCH_VERB_RE.search(text):
+            return True
+        return self.model is not None and self.model.predict(text) >= 0.5
+
+    def confidence_for(self, message: str, intent: str) -> Optional[float]:
+        """Model probability of an intent decided elsewhere (e.g. by the LLM), if a model is trained."""
+        if self.model is None:
+            return None
+        probability = self.model.predict(message)
+        return probability if intent == "research" else 1 - probability
+
+    def log_decision(self, message: str, decision: Dict[str, Any]) -> None:
+        """Append a router LLM decision to the training log."""
+        record = {"message": message, "user_intent": decision.get("user_intent"),
+                  "research_query": decision.get("research_query")}
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def retrain(self, min_examples: int = 50) -> int:
+        """Fit a new model on the decision log; returns the number of examples used (0 if too few)."""
+        examples = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("user_intent") in ("research", "conversation") and record.get("message"):
+                        examples.append((record["message"], 1 if record["user_intent"] == "research" else 0))
+        if len(examples) < min_examples:
+            return 0
+        model = HashedLogisticModel()
+        model.fit(examples)
+        model.save(self.model_path)
+        self.model = model
+        return len(examples)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        fast = counters["rule_decisions"] + counters["model_decisions"]
+        return {
+            **counters,
+            "fast_path_ratio": fast / counters["messages"] if counters["messages"] else 0.0,
+            "threshold": self.threshold,
+            "model_trained_examples": self.model.trained_examples if self.model else 0,
+        }
+
+
+_intent_classifier: Optional[IntentClassifier] = None
+_intent_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Return the process-wide fast-path classifier, configured from environment variables."""
+    global _intent_classifier
+    with _intent_classifier_lock:
+        if _intent_classifier is None:
+            _intent_classifier = IntentClassifier(
+                model_path=os.getenv("ROUTER_MODEL_PATH"),
+                log_path=os.getenv("ROUTER_DECISION_LOG"),
+                threshold=float(os.getenv("ROUTER_FAST_PATH_THRESHOLD", "0.9")),
+            )
+        return _intent_classifier
+
+
+def retrain():
+    used = get_intent_classifier().retrain()
+    if used:
+        print(f"Trained router model on {used} logged decisions")
+    else:
+        print("Not enough logged router decisions to train yet")
+
+
+if __name__ == "__main__":
+    retrain()
@@ -0,0 +1,185 @@
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity; `retry_after` is a suggested wait in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    """A unit of background work and its status, progress and result."""
+
+    def __init__(self, fn: Callable[["Job"], Any], kind: str, params: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.params = params
+        self.fn = fn
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {"stage": "queued"}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update_progress(self, **progress: Any) -> None:
+        with self._lock:
+            self.progress = {**self.progress, **progress}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobQueue:
+    """
+    Bounded FIFO of jobs drained by a fixed pool of worker threads.
+
+    `submit` never blocks: when `max_depth` jobs are already waiting it raises
+    QueueFullError with a Retry-After estimate from recent job durations.
+    Finished jobs are kept for `retention_seconds` so clients can poll them;
+    expired ones are pruned on every submit and every completion.
+    """
+
+    def __init__(self, workers: int, max_depth: int = 100, retention_seconds: float = 3600):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=max_depth)
+        self._jobs: Dict[str, Job] = {}
+        self._durations: List[float] = []
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        self._running = 0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"research-job-{index}", daemon=True) for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        with self._lock:
+            recent = self._durations[-50:]
+        average = sum(recent) / len(recent) if recent else 30.0
+        return max(1, math.ceil(average * max(self._queue.qsize(), 1) / self.workers))
+
+    def submit(self, fn: Callable[[Job], Any], kind: str = "research", **params: Any) -> Job:
+        self._prune()
+        job = Job(fn, kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self._counters["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+        with self._lock:
+            self._counters["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._running += 1
+            with job._lock:
+                job.status = "running"
+                job.started_at = time.time()
+                job.progress = {**job.progress, "stage": "started"}
+            outcome = "failed"
+            try:
+                result = job.fn(job)
+                with job._lock:
+                    job.result = result
+                    job.status = "succeeded"
+                    job.progress = {**job.progress, "stage": "done"}
+                outcome = "succeeded"
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except BaseException as e:
+                # FlowCancelled and BudgetExhausted are BaseExceptions; one escaping must not kill the worker
+                with job._lock:
+                    job.error = str(e) or type(e).__name__
+            finally:
+                with job._lock:
+                    job.finished_at = time.time()
+                    if outcome == "failed":
+                        job.status = "failed"
+                        job.progress = {**job.progress, "stage": "failed"}
+                with self._lock:
+                    self._running -= 1
+                    self._counters[outcome] += 1
+                    self._durations.append(job.finished_at - job.started_at)
+                    del self._durations[:-200]
+                self._queue.task_done()
+            self._prune()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["running"] = self._running
+            counters["tracked_jobs"] = len(self._jobs)
+            recent = self._durations[-50:]
+        counters.update({
+            "queued": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "workers": self.workers,
+            "avg_duration_seconds": sum(recent) / len(recent) if recent else 0.0,
+        })
+        return counters
+
+
+def default_job_workers() -> int:
+    """Research jobs mostly wait on network I/O, so allow a few per core."""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide research job queue, configured from environment variables."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                workers=int(os.getenv("RESEARCH_JOB_WORKERS") or default_job_workers()),
+                max_depth=int(os.getenv("RESEARCH_JOB_QUEUE_DEPTH", "100")),
+                retention_seconds=float(os.getenv("RESEARCH_JOB_RETENTION", "3600")),
+            )
+        return _job_queue
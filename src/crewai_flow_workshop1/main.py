@@ -2,13 +2,36 @@
 
 from crewai.flow import Flow, listen, start, router, persist
 from pydantic import BaseModel, Field
-from typing import Literal, List, Optional
+from typing import Any, Dict, Literal, List, Optional
 from datetime import datetime
-from crewai import LLM, Agent
 import json
+import os
 import sys
-
+import time
+
+from crewai_flow_workshop1.budget import BudgetExhausted, budget_scope, budget_stats, min_llm_seconds
+from crewai_flow_workshop1.cancellation import FlowCancelled, cancel_scope
+from crewai_flow_workshop1.config import env_flag
+from crewai_flow_workshop1.history_window import get_history_window
+from crewai_flow_workshop1.intent_classifier import get_intent_classifier
+from crewai_flow_workshop1.persistence import get_flow_persistence
+from crewai_flow_workshop1.prefetch import prefetch_stats, start_prefetch
+from crewai_flow_workshop1.registry import get_llm, get_research_agent
+from crewai_flow_workshop1.research_engines import (
+    RESEARCH_ENGINES,
+    UsageRecorder,
+    normalize_usage,
+    research_engine_stats,
+    summarize_runs,
+    usage_callback,
+)
+from crewai_flow_workshop1.router_cache import get_router_cache
+from crewai_flow_workshop1.single_flight import research_flights
+from crewai_flow_workshop1.streaming import stream_tokens_to
+from crewai_flow_workshop1.tools.compaction import result_sources
 from crewai_flow_workshop1.tools.deep_research_paper import DeepResearchPaper # Using the local tool
+from crewai_flow_workshop1.tools.dedup import deduplicate_sources
+from crewai_flow_workshop1.tools.search_cache import normalize_query
 # from deep_research_paper_tool.tool import DeepResearchPaper # Importing tool from crewai tool repository
 
 class Message(BaseModel):
@@ -20,6 +43,7 @@ class RouterIntent(BaseModel):
     user_intent: Literal["research", "conversation"]
     research_query: Optional[str] = None
     reasoning: str
+    confidence: Optional[float] = Field(default=None, description="Confidence in the intent classification, from 0 to 1")
 
 class Source(BaseModel):
     url: str
@@ -39,11 +63,22 @@ class SearchResult(BaseModel):
 class FlowState(BaseModel):
     user_message: str = ""
     message_history: List[Message] = []
+    history_summary: str = ""
+    summarized_count: int = 0
     research_query: Optional[str] = None
     user_intent: Optional[Literal["research", "conversation"]] = None
+    intent_confidence: Optional[float] = None
+    intent_reasoning: Optional[str] = None
     search_result: Optional[SearchResult] = None
+    research_engine: Literal["agent", "direct"] = Field(
+        default_factory=lambda: os.getenv("RESEARCH_ENGINE", "agent")
+    )
+    research_metrics: Optional[Dict[str, Any]] = None
+    # Set when the latency budget ran out and the answer is incomplete
+    partial: bool = False
+    partial_reason: Optional[str] = None
 
-@persist()
+@persist(get_flow_persistence())
 class DeepResearchFlow(Flow[FlowState]):
 
     def add_message(self, role: str, content: str):
@@ -51,6 +86,142 @@ class DeepResearchFlow(Flow[FlowState]):
         new_message = Message(role=role, content=content)
         self.state.message_history.append(new_message)
 
+    def history_context(self) -> str:
+        """Compact view of the conversation (rolling summary plus recent turns) for prompts"""
+        return get_history_window().render(
+            self.state.message_history,
+            self.state.history_summary,
+            exclude_message=self.state.user_message,
+            summarized_count=self.state.summarized_count,
+        )
+
+    def update_history_summary(self):
+        """Fold messages that dropped out of the prompt window into the rolling summary, a batch at a time"""
+        window = get_history_window()
+        new_messages, summarized_count = window.pending(self.state.message_history, self.state.summarized_count)
+        if new_messages:
+            # The answer is ready; a budgeted or cancelled turn does not wait on a summary LLM call
+            token = getattr(self, "_cancel_token", None)
+            use_llm = self.latency_budget is None and not (token is not None and token.cancelled)
+            with self.cancellable(), budget_scope(self.latency_budget):
+                self.state.history_summary = window.fold(
+                    self.state.history_summary, new_messages, use_llm=use_llm, llm_options=self.llm_options()
+                )
+            self.state.summarized_count = summarized_count
+
+    def take_prefetched_results(self):
+        """Prefetched search results if they fit the router's research query, otherwise None"""
+        prefetch = getattr(self, "_prefetch", None)
+        self._prefetch = None
+        if prefetch is None:
+            return None
+        if not prefetch.fits(self.state.research_query):
+            prefetch.discard("mismatched")
+            return None
+        timeout = float(os.getenv("SPECULATIVE_PREFETCH_WAIT", "30"))
+        token = getattr(self, "_cancel_token", None)
+        if token is not None and token.remaining() is not None:
+            timeout = min(timeout, token.remaining())
+        if self.latency_budget is not None:
+            timeout = min(timeout, self.latency_budget.remaining())
+        results = prefetch.result(timeout=timeout)
+        if results is not None:
+            prefetch_stats.count("hits")
+        elif not prefetch.future.done():
+            # Too slow: stop it rather than run it alongside the search that replaces it
+            prefetch.discard("timeout")
+        return results
+
+    def discard_prefetch(self):
+        prefetch = getattr(self, "_prefetch", None)
+        self._prefetch = None
+        if prefetch is not None:
+            prefetch.discard("wasted_on_conversation")
+
+    def set_event_sink(self, sink):
+        """Receive progress events as sink(event, data); also makes the summary and replies stream"""
+        self._event_sink = sink
+
+    @property
+    def streaming(self) -> bool:
+        return getattr(self, "_event_sink", None) is not None
+
+    def emit_event(self, event: str, data: dict):
+        sink = getattr(self, "_event_sink", None)
+        if sink is not None:
+            try:
+                sink(event, data)
+            except Exception as e:
+                print(f"Dropping {event} event: {e}")
+
+    def set_cancel_token(self, token):
+        """Stop between steps, before agent iterations and before tool calls once `token` fires"""
+        self._cancel_token = token
+
+    def cancellable(self):
+        """Context in which crewAI LLM calls and tool uses check the cancel token"""
+        return cancel_scope(getattr(self, "_cancel_token", None))
+
+    def check_cancelled(self, stage: str):
+        token = getattr(self, "_cancel_token", None)
+        if token is not None and token.cancelled:
+            prefetch = getattr(self, "_prefetch", None)
+            self._prefetch = None
+            if prefetch is not None:
+                prefetch.discard("cancelled")
+            token.check(stage)
+
+    def set_latency_budget(self, budget):
+        """Fit this turn into `budget`: shorter timeouts, fewer agent iterations and partial results once it runs out"""
+        self._latency_budget = budget
+
+    @property
+    def latency_budget(self):
+        return getattr(self, "_latency_budget", None)
+
+    def llm_options(self) -> dict:
+        """Extra get_llm options that keep an LLM call within the latency budget"""
+        budget = self.latency_budget
+        return {"timeout": budget.llm_timeout()} if budget is not None else {}
+
+    def mark_partial(self, reason: str):
+        self.state.partial = True
+        self.state.partial_reason = reason
+        budget_stats.record_partial(reason)
+        self.emit_event("partial", {"reason": reason})
+
+    def emit_sources(self, sources: List[dict]):
+        """Announce a finished search and each of its sources (url, title, snippet)"""
+        self.emit_event("search_finished", {"query": self.state.research_query, "source_count": len(sources)})
+        for index, source in enumerate(sources, 1):
+            self.emit_event("source", {"index": index, **source})
+
+    def stream_tokens(self):
+        return stream_tokens_to(lambda chunk: self.emit_event("token", {"text": chunk}))
+
+    def apply_router_decision(self, decision: dict):
+        """Store a router decision (from the LLM or the fast path) in the flow state"""
+        self.state.research_query = decision.get("research_query")
+        self.state.user_intent = decision.get("user_intent")
+        self.state.intent_confidence = decision.get("confidence")
+        self.state.intent_reasoning = decision.get("reasoning")
+        self.emit_event("router", {
+            "intent": self.state.user_intent,
+            "research_query": self.state.research_query,
+            "confidence": self.state.intent_confidence,
+            "reasoning": self.state.intent_reasoning,
+        })
+        return self.state.user_intent
+
+    def reset_turn(self):
+        self.state.research_query = None
+        self.state.user_intent = None
+        self.state.intent_confidence = None
+        self.state.intent_reasoning = None
+        self.state.search_result = None
+        self.state.research_metrics = None
+        self.state.partial = False
+        self.state.partial_reason = None
 
     @start()
     def starting_flow(self):
@@ -60,21 +231,77 @@ class DeepResearchFlow(Flow[FlowState]):
                 self.state.user_message = input("Enter your message: ")
             except EOFError:
                 raise ValueError("No user message provided. Please run with: python src/crewai_flow_workshop1/main.py 'your message here'")
+        self.check_cancelled("start")
+        if self.latency_budget is not None:
+            budget_stats.count("budgeted_turns")
         
+        # A resumed conversation starts each turn without the previous turn's routing and results
+        self.reset_turn()
+
         # Add the user message to history
         if self.state.user_message:
             self.add_message("user", self.state.user_message)
 
+        # Speculatively start the paper search while the router decides
+        self._prefetch = None
+        if env_flag("SPECULATIVE_PREFETCH") and get_intent_classifier().looks_like_research(self.state.user_message):
+            self._prefetch = start_prefetch(
+                self.state.user_message, cancel_token=getattr(self, "_cancel_token", None), budget=self.latency_budget
+            )
+
         return self.state.user_message
 
 
 
     @router(starting_flow)
     def routing_intent(self):
+        return self.decide_intent()
+
+    def decide_intent(self) -> Optional[str]:
+        """
+        Route the current message without running the flow.
+
+        Kept out of the flow methods so callers can classify a message on a
+        throwaway flow (e.g. to pick a scheduling lane) without persisting it.
+        """
+        self.check_cancelled("router")
+
+        # Obvious messages are decided locally without an LLM round-trip
+        classifier = get_intent_classifier()
+        if env_flag("ROUTER_FAST_PATH", default=True):
+            fast_intent = classifier.classify(self.state.user_message, has_history=len(self.state.message_history) > 1)
+            if fast_intent is not None:
+                print(f"Router Decision ({fast_intent.method} fast path): {fast_intent.model_dump_json()}")
+                return self.apply_router_decision(fast_intent.model_dump())
+
+        budget = self.latency_budget
+        if budget is not None and not budget.allows(min_llm_seconds()):
+            # No time left for the router LLM; fall back to the permissive keyword check
+            budget_stats.count("router_llm_skipped")
+            research = classifier.looks_like_research(self.state.user_message)
+            return self.apply_router_decision({
+                "user_intent": "research" if research else "conversation",
+                "research_query": self.state.user_message if research else None,
+                "reasoning": "Latency budget too small for the router LLM; decided by keyword heuristics",
+                "confidence": None,
+            })
+
+        # The same message with the same recent context is served from the shared decision cache
+        with self.cancellable():
+            decision = get_router_cache().get_or_compute(
+                self.state.user_message, self.state.message_history, self.classify_with_llm
+            )
+        if decision is not None:
+            return self.apply_router_decision(decision)
+
+    def classify_with_llm(self) -> Optional[dict]:
+        """Ask the router LLM to classify the current message"""
+        classifier = get_intent_classifier()
 
-        llm = LLM(model="gpt-4.1-mini", 
+        llm = get_llm("gpt-4.1-mini",
             temperature=0.1,
-            response_format=RouterIntent)
+            response_format=RouterIntent,
+            **self.llm_options())
 
         prompt = f"""
         === TASK ===
@@ -100,7 +327,7 @@ class DeepResearchFlow(Flow[FlowState]):
         {self.state.user_message}
 
         **Recent Conversation History:**
-        {self.state.message_history}
+        {self.history_context()}
 
         === OUTPUT REQUIREMENTS ===
         1. **user_intent**: Must be either "research" or "conversation"
@@ -108,6 +335,7 @@ class DeepResearchFlow(Flow[FlowState]):
         - If intent is "research": Generate a comprehensive, specific research query that incorporates context from conversation history and current message
         - If intent is "conversation": Set to null
         3. **reasoning**: Provide clear reasoning for your classification decision
+        4. **confidence**: Your confidence in the classification, from 0.0 to 1.0
 
         === EXAMPLES ===
         **Research Example:**
@@ -135,14 +363,20 @@ class DeepResearchFlow(Flow[FlowState]):
 
         if isinstance(response, str):
             response_data = json.loads(response)
-            self.state.research_query = response_data.get("research_query")
-            self.state.user_intent = response_data.get("user_intent")
-            return response_data.get("user_intent")
+            classifier.log_decision(self.state.user_message, response_data)
+            if response_data.get("confidence") is None:
+                response_data["confidence"] = classifier.confidence_for(
+                    self.state.user_message, response_data.get("user_intent")
+                )
+            return response_data
+        return None
 
     @listen("conversation")
     def follow_up_conversation(self):
+        self.discard_prefetch()
+        self.check_cancelled("conversation")
 
-        llm = LLM(model="gpt-4.1-mini", temperature=0.7)
+        llm = get_llm("gpt-4.1-mini", temperature=0.7, stream=self.streaming, **self.llm_options())
 
         prompt = f"""
         === ROLE ===
@@ -156,7 +390,7 @@ class DeepResearchFlow(Flow[FlowState]):
         {self.state.user_message}
 
         **Recent Conversation History:**
-        {self.state.message_history}
+        {self.history_context()}
 
         === INSTRUCTIONS ===
         1. **Respond naturally**: Address the user's message directly and conversationally
@@ -182,36 +416,45 @@ class DeepResearchFlow(Flow[FlowState]):
 
         Respond to the user's message now:"""
 
-        response = llm.call(prompt)
+        try:
+            with self.stream_tokens(), self.cancellable():
+                response = llm.call(prompt)
+        except Exception as e:
+            if self.latency_budget is None:
+                raise
+            print(f"Conversation reply failed within the latency budget: {e}")
+            response = "Sorry, I ran out of time to answer that. Could you ask again?"
+            self.mark_partial("conversation_failed")
+            self.emit_event("token", {"text": response})
         
         # Add the conversation response to history
         self.add_message("assistant", response)
+        self.update_history_summary()
         
         print(f"Conversation response: {response}")
         return response
 
-    @listen("research")
-    def handle_research(self):
-        try:
-            print(f"Starting research with query: {self.state.research_query}")
-            
-            # Create an Agent for deep research
-            analyst = Agent(
-                role="Deep Research Specialist",
-                goal="Conduct comprehensive research on specific queries, returning a summary response and detailed sources data",
-                backstory="You are an expert researcher with access to academic databases and research sources. "
-                "You excel at finding relevant scholarly papers, studies, and research findings, "
-                "synthesizing multiple academic sources, and providing comprehensive insights from credible research.",
-                tools=[DeepResearchPaper()],
-                verbose=True,
-            )
-            
-            # Execute the research
-            task = f"""
+    def research_task_instructions(self, prefetched_results: Optional[dict]) -> str:
+        """Task description for the research agent"""
+        if prefetched_results is not None:
+            search_instructions = f"""
+            The Deep Research Paper Search tool has already been run for this query: {self.state.research_query}
+            These are its results:
+            {json.dumps(prefetched_results)}
+
+            Use these results directly. Only call the tool if they are clearly insufficient, and then pass
+            all additional angles together in the tool's `queries` list in a single call.
+            """
+        else:
+            search_instructions = f"""
             Use the Deep Research Paper Search tool to research the following query: {self.state.research_query}
             
             Call the tool with exactly this query parameter: {self.state.research_query}
-            
+            If you need additional angles on the topic, pass them together in the tool's `queries` list
+            in that same call instead of calling the tool again for each one.
+            """
+
+        return f"""{search_instructions}
             After getting the research results, provide a comprehensive summary that:
             - Combines ALL found sources into a single, cohesive narrative
             - Each piece of information MUST be immediately followed by its source URL in parentheses: (https://example.com/source)
@@ -220,10 +463,193 @@ class DeepResearchFlow(Flow[FlowState]):
             Example format:
             "According to recent research, AI adoption is increasing rapidly (https://example.com/source1), while challenges remain in implementation (https://example.com/source2)."
             """
-        
-            research_result = analyst.kickoff(task, response_format=SearchResult)
 
-            self.state.search_result = research_result.pydantic
+    def run_agent_research(self, prefetched_results: Optional[dict]):
+        """ReAct agent research: the agent decides when to call the tool and formats the result"""
+        analyst = get_research_agent()
+        budget = self.latency_budget
+        if budget is None:
+            with self.cancellable():
+                research_result = analyst.kickoff(self.research_task_instructions(prefetched_results), response_format=SearchResult)
+            return research_result.pydantic, normalize_usage(research_result.usage_metrics)
+
+        # Fewer iterations for a tight budget, and stop early enough to still summarize what was found
+        analyst = get_research_agent(max_iter=budget.max_iterations(analyst.max_iter))
+        if prefetched_results is not None:
+            budget.results.append(prefetched_results)
+        agent_budget = budget.reserve(float(os.getenv("BUDGET_SYNTHESIS_SECONDS", "8")))
+        try:
+            with self.cancellable(), budget_scope(agent_budget):
+                research_result = analyst.kickoff(self.research_task_instructions(prefetched_results), response_format=SearchResult)
+        except BudgetExhausted:
+            return self.partial_research("agent_interrupted")
+        return research_result.pydantic, normalize_usage(research_result.usage_metrics)
+
+    def run_direct_research(self, prefetched_results: Optional[dict]):
+        """Single-shot research: one tool call, then exactly one structured-output LLM call"""
+        results = prefetched_results
+        if results is None:
+            with self.cancellable(), budget_scope(self.latency_budget):
+                results = DeepResearchPaper()._run(query=self.state.research_query)
+        if isinstance(results, str):
+            raise RuntimeError(results)
+        self.check_cancelled("synthesis")
+        sources = result_sources(results)
+        self.emit_sources(sources)
+
+        budget = self.latency_budget
+        if budget is None:
+            return self.synthesize_research(results, sources, stream=self.streaming)
+        if not budget.allows(min_llm_seconds()):
+            return self.source_list_result(sources, "no_time_for_synthesis")
+        try:
+            return self.synthesize_research(results, sources, stream=self.streaming)
+        except Exception as e:
+            print(f"Synthesis failed within the latency budget, returning the sources: {e}")
+            return self.source_list_result(sources, "synthesis_failed")
+
+    def synthesize_research(self, results: Any, sources: List[dict], stream: bool):
+        """Write the research summary for search results with one LLM call; returns (SearchResult, token usage)"""
+        recorder = UsageRecorder()
+        model = os.getenv("RESEARCH_SYNTHESIS_MODEL", "gpt-4.1-mini")
+        if stream:
+            # Structured JSON cannot be shown while it streams, so stream prose and list the cited sources
+            llm = get_llm(model, temperature=0.2, stream=True, **self.llm_options())
+            output_format = "- Respond with the summary text only, without a separate source list"
+        else:
+            llm = get_llm(model, temperature=0.2, response_format=SearchResult, **self.llm_options())
+            output_format = "- Include ALL sources used in sources_list with url, title, and relevant_content for each"
+
+        prompt = f"""
+        === TASK ===
+        You are a Deep Research Specialist. Write a research summary for this query: {self.state.research_query}
+
+        === SEARCH RESULTS ===
+        {json.dumps(results)}
+
+        === OUTPUT REQUIREMENTS ===
+        - Combine ALL relevant sources above into a single, cohesive narrative organized by topics/themes
+        - Each piece of information MUST be immediately followed by its source URL in parentheses: (https://example.com/source)
+        - Only cite URLs that appear in the search results
+        {output_format}"""
+
+        with self.stream_tokens(), self.cancellable(), recorder.recording():
+            response = llm.call(prompt, callbacks=[usage_callback])
+
+        if stream:
+            cited = [source for source in sources if source.get("url") and source["url"] in response] or sources
+            search_result = SearchResult(
+                research_summary=response,
+                sources_list=[
+                    Source(url=source.get("url", ""), title=source.get("title", ""), relevant_content=source.get("snippet", ""))
+                    for source in cited
+                ],
+            )
+        else:
+            search_result = response if isinstance(response, SearchResult) else SearchResult.model_validate_json(response)
+        return search_result, normalize_usage(recorder.usage())
+
+    def source_list_result(self, sources: List[dict], reason: str):
+        """Partial research result without synthesis: the sources found so far as a plain list"""
+        self.mark_partial(reason)
+        lines = [f"- {source.get('title') or source.get('url')} ({source.get('url')})" for source in sources]
+        summary = "There was not enough time to write a full research summary. Sources found so far:\n" + "\n".join(lines)
+        if not sources:
+            summary = "There was not enough time to finish this research and no sources were found yet. Please try again with more time."
+        if self.streaming and self.state.research_engine == "direct":
+            self.emit_event("token", {"text": summary})
+        search_result = SearchResult(
+            research_summary=summary,
+            sources_list=[
+                Source(url=source.get("url", ""), title=source.get("title", ""), relevant_content=source.get("snippet", ""))
+                for source in sources
+            ],
+        )
+        return search_result, normalize_usage(None)
+
+    def partial_research(self, reason: str):
+        """Answer from the searches finished so far: a quick summary if time allows, else the raw source list"""
+        budget = self.latency_budget
+        sources: List[dict] = []
+        seen_urls = set()
+        for results in budget.results:
+            for source in result_sources(results):
+                if source.get("url") not in seen_urls:
+                    seen_urls.add(source.get("url"))
+                    sources.append(source)
+        if not sources or not budget.allows(min_llm_seconds()):
+            return self.source_list_result(sources, reason)
+        try:
+            search_result, usage = self.synthesize_research(sources, sources, stream=False)
+        except Exception as e:
+            print(f"Summary of partial research failed, returning the sources: {e}")
+            return self.source_list_result(sources, reason)
+        self.mark_partial(reason)
+        return search_result, usage
+
+    def run_research_engine(self, engine: str):
+        """Run one research engine; returns (SearchResult, token usage)"""
+        prefetched_results = self.take_prefetched_results()
+        if engine == "direct":
+            return self.run_direct_research(prefetched_results)
+        return self.run_agent_research(prefetched_results)
+
+    @listen("research")
+    def handle_research(self):
+        try:
+            self.check_cancelled("research")
+            engine = self.state.research_engine
+            print(f"Starting research ({engine} engine) with query: {self.state.research_query}")
+            self.emit_event("search_started", {"query": self.state.research_query, "engine": engine})
+
+            # Execute the research; concurrent flows with the same query and engine share one run
+            started = time.perf_counter()
+            try:
+                if self.latency_budget is not None:
+                    # Budgeted runs may come back partial, so they are not shared with other flows
+                    (search_result, usage), shared = self.run_research_engine(engine), False
+                else:
+                    (search_result, usage), shared = research_flights.do(
+                        (normalize_query(self.state.research_query or ""), engine),
+                        lambda: self.run_research_engine(engine),
+                        check=lambda: self.check_cancelled("research_wait"),
+                    )
+            except FlowCancelled as e:
+                # Only give up if this flow was cancelled, not the one whose run it was sharing
+                self.check_cancelled(e.stage)
+                (search_result, usage), shared = self.run_research_engine(engine), False
+            latency = time.perf_counter() - started
+            if shared:
+                if getattr(self, "_prefetch", None) is not None:
+                    self._prefetch.discard("coalesced")
+                    self._prefetch = None
+                usage = normalize_usage(None)
+            if search_result is not None:
+                # The shared result is mutated below, so every flow works on its own copy
+                search_result = search_result.model_copy(deep=True)
+                if shared or engine != "direct":
+                    # Only the direct engine streams while it works; otherwise send everything now
+                    self.emit_sources([
+                        {"url": source.url, "title": source.title, "snippet": source.relevant_content}
+                        for source in search_result.sources_list
+                    ])
+                    self.emit_event("token", {"text": search_result.research_summary})
+
+            self.state.search_result = search_result
+            self.state.research_metrics = {
+                "engine": engine, "latency_seconds": latency, "coalesced": shared, "partial": self.state.partial, **usage
+            }
+            if not shared:
+                research_engine_stats.record(engine, latency, usage)
+            print(f"Research metrics: {self.state.research_metrics}")
+
+            # The agent may still cite the same paper under several URLs; keep one per cluster
+            if self.state.search_result and self.state.search_result.sources_list:
+                unique_sources, _ = deduplicate_sources(
+                    [source.model_dump() for source in self.state.search_result.sources_list],
+                    text_key="relevant_content",
+                )
+                self.state.search_result.sources_list = [Source(**source) for source in unique_sources]
 
             # Add the research result to conversation history (handle Unicode)
             try:
@@ -233,6 +659,7 @@ class DeepResearchFlow(Flow[FlowState]):
             except Exception as e:
                 # Fallback if Unicode handling fails
                 self.add_message("assistant", "Research completed successfully. Results available.")
+            self.update_history_summary()
             
             # Print the research results to console with Unicode handling
             try:
@@ -285,6 +712,50 @@ def plot():
     research_flow.plot()
 
 
+def benchmark_engines():
+    """
+    Compare latency and token usage of the agent and direct research engines.
+
+    Usage: benchmark_engines "query one" "query two" ... [--rounds N]
+
+    Each query is searched once up front so both engines read the same cached
+    results, leaving the LLM orchestration as the difference being measured.
+    The engine order alternates between rounds.
+    """
+    args = sys.argv[1:]
+    rounds = 1
+    if "--rounds" in args:
+        index = args.index("--rounds")
+        rounds = int(args[index + 1])
+        del args[index:index + 2]
+    queries = args or ["recent advances in retrieval augmented generation for question answering"]
+
+    runs: Dict[str, List[Dict[str, Any]]] = {engine: [] for engine in RESEARCH_ENGINES}
+    for query in queries:
+        DeepResearchPaper()._run(query=query)
+        for round_number in range(rounds):
+            engines = RESEARCH_ENGINES if round_number % 2 == 0 else tuple(reversed(RESEARCH_ENGINES))
+            for engine in engines:
+                flow = DeepResearchFlow(tracing=False)
+                flow.state.research_query = query
+                flow.state.research_engine = engine
+                flow.handle_research()
+                if flow.state.research_metrics:
+                    runs[engine].append(flow.state.research_metrics)
+
+    summaries = {engine: summarize_runs(items) for engine, items in runs.items()}
+    fields = ["runs", "latency_mean_seconds", "latency_p50_seconds", "latency_p95_seconds",
+              "successful_requests_mean", "prompt_tokens_mean", "completion_tokens_mean", "total_tokens_mean"]
+    print("\n" + "=" * 80)
+    print("RESEARCH ENGINE BENCHMARK")
+    print("=" * 80)
+    print(f"{'metric':<28}" + "".join(f"{engine:>16}" for engine in RESEARCH_ENGINES))
+    for field in fields:
+        values = [summaries[engine].get(field, 0) for engine in RESEARCH_ENGINES]
+        print(f"{field:<28}" + "".join(f"{value:>16.2f}" for value in values))
+    return summaries
+
+
 if __name__ == "__main__":
     message = None
     if len(sys.argv) > 1:
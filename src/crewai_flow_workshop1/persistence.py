@@ -0,0 +1,311 @@
+import atexit
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from crewai.flow.persistence import FlowPersistence, SQLiteFlowPersistence
+from pydantic import BaseModel
+
+from crewai_flow_workshop1.config import data_path
+
+
+def state_delta(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """
+    Fields that changed between two state dicts.
+
+    Lists that only grew at the end (message_history) are returned as the
+    appended items; every other changed field is returned whole.
+    """
+    previous = previous or {}
+    changed: Dict[str, Any] = {}
+    appended: Dict[str, List[Any]] = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if key in previous and old == value:
+            continue
+        if (
+            isinstance(old, list)
+            and isinstance(value, list)
+            and len(value) > len(old)
+            and value[: len(old)] == old
+        ):
+            appended[key] = value[len(old):]
+        else:
+            changed[key] = value
+    return changed, appended
+
+
+def apply_delta(state: Dict[str, Any], changed: Dict[str, Any], appended: Dict[str, List[Any]]) -> Dict[str, Any]:
+    state.update(changed)
+    for key, items in appended.items():
+        state[key] = list(state.get(key) or []) + items
+    return state
+
+
+class DeltaFlowPersistence(FlowPersistence):
+    """
+    Write-behind @persist backend that stores per-step deltas instead of full states.
+
+    `save_state` diffs the state against the last one saved for the flow and
+    queues only the changed fields and appended messages; a background thread
+    writes queued deltas in one transaction at most every `flush_interval`
+    seconds. Once a flow has `compact_every` deltas they are folded into its
+    snapshot. `load_state` serves recently used flows from memory and otherwise
+    reads one snapshot plus the short delta tail, falling back to the default
+    crewAI store for flows saved before this backend was enabled.
+
+    Several processes (uvicorn workers) may share the database: a cached state
+    is only served while no other process has written a newer delta for the
+    flow, so the next save diffs against the latest state. Two processes
+    running the same flow at the same moment are not serialized.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        flush_interval: float = 0.5,
+        compact_every: int = 20,
+        cache_size: int = 256,
+        fallback: Optional[FlowPersistence] = None,
+    ):
+        self.db_path = str(db_path or data_path("flow_state_deltas.db"))
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.cache_size = cache_size
+        self.fallback = fallback
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Newest delta id in the database that each cached state already includes
+        self._versions: Dict[str, int] = {}
+        self._pending: List[Tuple[str, str, float, str, str]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._counters = {
+            "saves": 0, "deltas_written": 0, "bytes_written": 0, "flushes": 0, "compactions": 0,
+            "loads_from_memory": 0, "loads_from_disk": 0, "loads_from_fallback": 0, "stale_cache_reloads": 0,
+            "flush_errors": 0,
+        }
+        self.init_db()
+        atexit.register(self.flush)
+
+    def init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS flow_snapshots (
+                    flow_uuid TEXT PRIMARY KEY,
+                    last_delta_id INTEGER NOT NULL,
+                    state_json TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS flow_deltas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    flow_uuid TEXT NOT NULL,
+                    method_name TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    changed_json TEXT NOT NULL,
+                    appended_json TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_flow_deltas_uuid ON flow_deltas (flow_uuid, id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _remember(self, flow_uuid: str, state: Dict[str, Any], version: Optional[int] = None) -> None:
+        # Caller holds self._lock
+        self._states[flow_uuid] = state
+        self._states.move_to_end(flow_uuid)
+        if version is not None:
+            self._versions[flow_uuid] = version
+        while len(self._states) > self.cache_size:
+            evicted, _ = self._states.popitem(last=False)
+            self._versions.pop(evicted, None)
+
+    def save_state(self, flow_uuid: str, method_name: str, state_data: Union[Dict[str, Any], BaseModel]) -> None:
+        if isinstance(state_data, BaseModel):
+            state_dict = state_data.model_dump(mode="json")
+        elif isinstance(state_data, dict):
+            state_dict = json.loads(json.dumps(state_data, default=str))
+        else:
+            raise ValueError(f"state_data must be either a Pydantic BaseModel or dict, got {type(state_data)}")
+
+        with self._lock:
+            # A flow evicted from memory gets a full-state delta, which replays correctly on its own
+            changed, appended = state_delta(self._states.get(flow_uuid), state_dict)
+            self._remember(flow_uuid, state_dict)
+            self._counters["saves"] += 1
+            if not changed and not appended:
+                return
+            self._pending.append((flow_uuid, method_name, time.time(), json.dumps(changed), json.dumps(appended)))
+            self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        # Caller holds self._lock
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="flow-state-writer", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self._count("flush_errors")
+                print(f"Flow state flush failed, will retry: {e}")
+
+    def flush(self) -> None:
+        """Write all queued deltas now and compact flows with a long delta tail."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                written: Dict[str, int] = {}
+                with self._connect() as conn:
+                    for item in batch:
+                        cursor = conn.execute(
+                            "INSERT INTO flow_deltas (flow_uuid, method_name, created_at, changed_json, appended_json) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            item,
+                        )
+                        written[item[0]] = cursor.lastrowid
+                    for flow_uuid in written:
+                        self._maybe_compact(conn, flow_uuid)
+            except Exception:
+                with self._lock:
+                    self._pending = batch + self._pending
+                raise
+            with self._lock:
+                for flow_uuid, delta_id in written.items():
+                    if flow_uuid in self._states:
+                        self._versions[flow_uuid] = delta_id
+            self._count("flushes")
+            self._count("deltas_written", len(batch))
+            self._count("bytes_written", sum(len(item[3]) + len(item[4]) for item in batch))
+
+    def _maybe_compact(self, conn: sqlite3.Connection, flow_uuid: str) -> None:
+        snapshot = conn.execute(
+            "SELECT last_delta_id FROM flow_snapshots WHERE flow_uuid = ?", (flow_uuid,)
+        ).fetchone()
+        last_delta_id = snapshot[0] if snapshot else 0
+        (tail,) = conn.execute(
+            "SELECT COUNT(*) FROM flow_deltas WHERE flow_uuid = ? AND id > ?", (flow_uuid, last_delta_id)
+        ).fetchone()
+        if tail < self.compact_every:
+            return
+        state, newest_id = self._read(conn, flow_uuid)
+        conn.execute(
+            "INSERT OR REPLACE INTO flow_snapshots (flow_uuid, last_delta_id, state_json, updated_at) VALUES (?, ?, ?, ?)",
+            (flow_uuid, newest_id, json.dumps(state), time.time()),
+        )
+        conn.execute("DELETE FROM flow_deltas WHERE flow_uuid = ? AND id <= ?", (flow_uuid, newest_id))
+        self._count("compactions")
+
+    def _read(self, conn: sqlite3.Connection, flow_uuid: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Snapshot plus replayed delta tail, and the id of the newest delta applied."""
+        snapshot = conn.execute(
+            "SELECT last_delta_id, state_json FROM flow_snapshots WHERE flow_uuid = ?", (flow_uuid,)
+        ).fetchone()
+        last_delta_id, state = (snapshot[0], json.loads(snapshot[1])) if snapshot else (0, None)
+        rows = conn.execute(
+            "SELECT id, changed_json, appended_json FROM flow_deltas WHERE flow_uuid = ? AND id > ? ORDER BY id",
+            (flow_uuid, last_delta_id),
+        ).fetchall()
+        for delta_id, changed_json, appended_json in rows:
+            state = apply_delta(state or {}, json.loads(changed_json), json.loads(appended_json))
+            last_delta_id = delta_id
+        return state, last_delta_id
+
+    def _newest_delta_id(self, conn: sqlite3.Connection, flow_uuid: str) -> int:
+        (newest,) = conn.execute(
+            "SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM flow_deltas WHERE flow_uuid = ? "
+            "UNION ALL SELECT last_delta_id FROM flow_snapshots WHERE flow_uuid = ?)",
+            (flow_uuid, flow_uuid),
+        ).fetchone()
+        return newest or 0
+
+    def load_state(self, flow_uuid: str) -> Optional[Dict[str, Any]]:
+        # Our own queued deltas go first, so the newest id on disk is comparable to the cached version
+        self.flush()
+        with self._connect() as conn:
+            newest_id = self._newest_delta_id(conn, flow_uuid)
+            with self._lock:
+                cached = self._states.get(flow_uuid)
+                if cached is not None and self._versions.get(flow_uuid, 0) >= newest_id:
+                    self._states.move_to_end(flow_uuid)
+                    self._counters["loads_from_memory"] += 1
+                    return copy.deepcopy(cached)
+                if cached is not None:
+                    # Another process wrote this flow since we cached it
+                    self._counters["stale_cache_reloads"] += 1
+            state, newest_id = self._read(conn, flow_uuid)
+        if state is not None:
+            self._count("loads_from_disk")
+        elif self.fallback is not None:
+            state = self.fallback.load_state(flow_uuid)
+            if state is None:
+                return None
+            self._count("loads_from_fallback")
+        else:
+            return None
+
+        with self._lock:
+            # Only the keys the state model knows about are diffed, so cache exactly what was restored
+            self._remember(flow_uuid, json.loads(json.dumps(state, default=str)), version=newest_id)
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["pending"] = len(self._pending)
+            counters["cached_flows"] = len(self._states)
+        counters["flush_interval"] = self.flush_interval
+        counters["compact_every"] = self.compact_every
+        return counters
+
+
+_flow_persistence: Optional[FlowPersistence] = None
+_flow_persistence_lock = threading.Lock()
+
+
+def get_flow_persistence() -> FlowPersistence:
+    """
+    Return the process-wide @persist backend.
+
+    FLOW_PERSISTENCE=delta (default) uses the write-behind delta store;
+    FLOW_PERSISTENCE=sqlite keeps crewAI's full-state SQLite store.
+    """
+    global _flow_persistence
+    with _flow_persistence_lock:
+        if _flow_persistence is None:
+            if os.getenv("FLOW_PERSISTENCE", "delta").strip().lower() == "sqlite":
+                _flow_persistence = SQLiteFlowPersistence()
+            else:
+                _flow_persistence = DeltaFlowPersistence(
+                    db_path=os.getenv("FLOW_PERSISTENCE_PATH"),
+                    flush_interval=float(os.getenv("FLOW_PERSISTENCE_FLUSH_INTERVAL", "0.5")),
+                    compact_every=int(os.getenv("FLOW_PERSISTENCE_COMPACT_EVERY", "20")),
+                    cache_size=int(os.getenv("FLOW_PERSISTENCE_CACHE_SIZE", "256")),
+                    fallback=SQLiteFlowPersistence(),
+                )
+        return _flow_persistence
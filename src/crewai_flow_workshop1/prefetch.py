@@ -0,0 +1,98 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, Optional
+
+from crewai_flow_workshop1.budget import LatencyBudget, budget_scope
+from crewai_flow_workshop1.cancellation import CancelToken, FlowCancelled, cancel_scope
+from crewai_flow_workshop1.tools.corpus_index import query_terms
+from crewai_flow_workshop1.tools.deep_research_paper import DeepResearchPaper
+
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPECULATIVE_PREFETCH_WORKERS", "8")), thread_name_prefix="research-prefetch"
+)
+
+
+class PrefetchStats:
+    """Counters for speculative research searches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"started": 0, "hits": 0, "mismatched": 0, "wasted_on_conversation": 0, "coalesced": 0, "cancelled": 0, "failed": 0, "timeout": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["hit_rate"] = counters["hits"] / counters["started"] if counters["started"] else 0.0
+        return counters
+
+
+prefetch_stats = PrefetchStats()
+
+
+class Prefetch:
+    """
+    A search started on the raw user message while the router is still deciding.
+
+    It runs under its own cancel token, a child of the flow's, so discarding a
+    mispredicted prefetch stops it before its next Firecrawl request, and so
+    does cancelling the flow.
+    """
+
+    def __init__(self, query: str, future: Future, token: CancelToken):
+        self.query = query
+        self.future = future
+        self.token = token
+
+    def fits(self, research_query: Optional[str], min_overlap: float = 0.5) -> bool:
+        """True when the router's research query covers enough of the prefetched query's terms."""
+        prefetched_terms = set(query_terms(self.query))
+        router_terms = set(query_terms(research_query or ""))
+        if not prefetched_terms or not router_terms:
+            return False
+        return len(prefetched_terms & router_terms) / len(prefetched_terms) >= min_overlap
+
+    def result(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """The prefetched compact results, or None if the search failed or is still running after `timeout`."""
+        try:
+            result = self.future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Still running; the caller decides whether to discard it
+            return None
+        except (Exception, FlowCancelled):
+            prefetch_stats.count("failed")
+            return None
+        if not isinstance(result, dict):
+            prefetch_stats.count("failed")
+            return None
+        return result
+
+    def discard(self, reason: str) -> None:
+        self.future.cancel()
+        self.token.cancel(reason)
+        prefetch_stats.count(reason)
+
+
+def _prefetch_search(query: str, token: CancelToken, budget: Optional[LatencyBudget]) -> Any:
+    with cancel_scope(token), budget_scope(budget):
+        return DeepResearchPaper()._run(query=query)
+
+
+def start_prefetch(query: str, cancel_token: Optional[CancelToken] = None,
+                   budget: Optional[LatencyBudget] = None) -> Prefetch:
+    """
+    Start a DeepResearchPaper search in the background and return its handle.
+
+    The search stops with `cancel_token` and fits into `budget`; its results are
+    not added to the budget's partial results until the router confirms them.
+    """
+    prefetch_stats.count("started")
+    token = CancelToken(parent=cancel_token)
+    search_budget = LatencyBudget(budget.remaining()) if budget is not None else None
+    future = _prefetch_executor.submit(_prefetch_search, query, token, search_budget)
+    return Prefetch(query, future, token)
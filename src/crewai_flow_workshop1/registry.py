@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Process-level registry of pre-built LLM clients and research agents.
+
+Building an `LLM` or an `Agent` validates its configuration and sets up
+clients, which the flow used to repeat on every message. Flows borrow shared
+instances from here instead. Sharing is safe across threads: neither object
+is mutated by `LLM.call` or `Agent.kickoff`, which runs each request on its
+own short-lived LiteAgent.
+
+Measure the per-request construction overhead with:
+
+    python -m crewai_flow_workshop1.registry
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+from crewai import LLM, Agent
+
+from crewai_flow_workshop1.tools.deep_research_paper import DeepResearchPaper
+
+RESEARCH_AGENT_ROLE = "Deep Research Specialist"
+RESEARCH_AGENT_GOAL = (
+    "Conduct comprehensive research on specific queries, returning a summary response and detailed sources data"
+)
+RESEARCH_AGENT_BACKSTORY = (
+    "You are an expert researcher with access to academic databases and research sources. "
+    "You excel at finding relevant scholarly papers, studies, and research findings, "
+    "synthesizing multiple academic sources, and providing comprehensive insights from credible research."
+)
+
+
+class Registry:
+    """Thread-safe build-once cache of objects keyed by their configuration."""
+
+    def __init__(self):
+        self._objects: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.borrowed = 0
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.borrowed += 1
+            obj = self._objects.get(key)
+            if obj is None:
+                obj = self._objects[key] = build()
+                self.built += 1
+            return obj
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "instances": len(self._objects),
+                "built": self.built,
+                "borrowed": self.borrowed,
+                "reused": self.borrowed - self.built,
+            }
+
+
+_registry = Registry()
+
+
+def llm_key(model: str, temperature: Optional[float], response_format: Optional[Type[Any]], **kwargs: Any) -> Tuple:
+    return ("llm", model, temperature, response_format, tuple(sorted(kwargs.items())))
+
+
+def get_llm(model: str, temperature: Optional[float] = None, response_format: Optional[Type[Any]] = None, **kwargs: Any) -> LLM:
+    """Shared LLM client for this configuration."""
+    return _registry.get(
+        llm_key(model, temperature, response_format, **kwargs),
+        lambda: LLM(model=model, temperature=temperature, response_format=response_format, **kwargs),
+    )
+
+
+def build_research_agent(model: Optional[str], verbose: bool, max_iter: Optional[int] = None) -> Agent:
+    """New deep research agent; without a model it uses crewAI's default LLM."""
+    options: Dict[str, Any] = {"llm": get_llm(model)} if model else {}
+    if max_iter is not None:
+        options["max_iter"] = max_iter
+    return Agent(
+        role=RESEARCH_AGENT_ROLE,
+        goal=RESEARCH_AGENT_GOAL,
+        backstory=RESEARCH_AGENT_BACKSTORY,
+        tools=[DeepResearchPaper()],
+        verbose=verbose,
+        **options,
+    )
+
+
+def get_research_agent(model: Optional[str] = None, verbose: bool = True, max_iter: Optional[int] = None) -> Agent:
+    """Shared deep research agent (with its DeepResearchPaper tool) for this model and iteration limit."""
+    model = model or os.getenv("RESEARCH_AGENT_MODEL") or None
+    return _registry.get(
+        ("research_agent", model, verbose, max_iter), lambda: build_research_agent(model, verbose, max_iter)
+    )
+
+
+def registry_stats() -> Dict[str, Any]:
+    return _registry.stats()
+
+
+def _time_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def benchmark(iterations: int = 50) -> Dict[str, float]:
+    """Milliseconds per request spent building the router, conversation and research objects."""
+    from crewai_flow_workshop1.main import RouterIntent
+
+    def construct():
+        LLM(model="gpt-4.1-mini", temperature=0.1, response_format=RouterIntent)
+        LLM(model="gpt-4.1-mini", temperature=0.7)
+        build_research_agent(None, verbose=True)
+
+    def borrow():
+        get_llm("gpt-4.1-mini", temperature=0.1, response_format=RouterIntent)
+        get_llm("gpt-4.1-mini", temperature=0.7)
+        get_research_agent(None, verbose=True)
+
+    borrow()
+    results = {
+        "construct_per_request_ms": _time_per_call(construct, iterations) * 1000,
+        "registry_per_request_ms": _time_per_call(borrow, iterations) * 1000,
+    }
+    print(f"Per-request setup over {iterations} iterations:")
+    print(f"  construct each time: {results['construct_per_request_ms']:.3f} ms")
+    print(f"  borrow from registry: {results['registry_per_request_ms']:.3f} ms")
+    return results
+
+
+def main():
+    benchmark(int(os.getenv("REGISTRY_BENCHMARK_ITERATIONS", "50")))
+
+
+if __name__ == "__main__":
+    main()
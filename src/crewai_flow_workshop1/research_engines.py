@@ -0,0 +1,100 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.utilities.token_counter_callback import TokenCalcHandler
+
+RESEARCH_ENGINES = ("agent", "direct")
+USAGE_FIELDS = ("total_tokens", "prompt_tokens", "cached_prompt_tokens", "completion_tokens", "successful_requests")
+
+_local = threading.local()
+
+
+class _ScopedUsageHandler(TokenCalcHandler):
+    """
+    One LLM callback for every call, counting into the calling thread's UsageRecorder.
+
+    crewAI's LLM.call hands usage to its callbacks from the calling thread, but
+    also installs them in litellm's process-wide callback lists. A per-flow
+    handler there would count every concurrent flow's calls; this shared one
+    only counts for the thread inside a `UsageRecorder.recording()` scope.
+    """
+
+    def __init__(self):
+        super().__init__(None)
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        recorder: Optional["UsageRecorder"] = getattr(_local, "recorder", None)
+        if recorder is not None:
+            TokenCalcHandler(recorder._process).log_success_event(kwargs, response_obj, start_time, end_time)
+
+
+usage_callback = _ScopedUsageHandler()
+
+
+class UsageRecorder:
+    """Sums token usage of the LLM calls made in its `recording()` scope with `callbacks=[usage_callback]`."""
+
+    def __init__(self):
+        self._process = TokenProcess()
+
+    @contextmanager
+    def recording(self) -> Iterator[None]:
+        previous = getattr(_local, "recorder", None)
+        _local.recorder = self
+        try:
+            yield
+        finally:
+            _local.recorder = previous
+
+    def usage(self) -> Dict[str, int]:
+        return self._process.get_summary().model_dump()
+
+
+def normalize_usage(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Usage metrics with every field present; `successful_requests` is the number of LLM round-trips."""
+    usage = usage or {}
+    return {field: int(usage.get(field) or 0) for field in USAGE_FIELDS}
+
+
+class ResearchEngineStats:
+    """Per-engine latency and token counters for completed research runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, List[Dict[str, Any]]] = {engine: [] for engine in RESEARCH_ENGINES}
+
+    def record(self, engine: str, latency_seconds: float, usage: Dict[str, int], max_runs: int = 500) -> None:
+        with self._lock:
+            runs = self._runs.setdefault(engine, [])
+            runs.append({"latency_seconds": latency_seconds, **normalize_usage(usage)})
+            del runs[:-max_runs]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = {engine: list(items) for engine, items in self._runs.items()}
+        return {engine: summarize_runs(items) for engine, items in runs.items()}
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run count plus mean and p50/p95 latency and mean token usage."""
+    if not runs:
+        return {"runs": 0}
+    latencies = sorted(run["latency_seconds"] for run in runs)
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)]
+
+    summary = {
+        "runs": len(runs),
+        "latency_mean_seconds": sum(latencies) / len(latencies),
+        "latency_p50_seconds": percentile(0.5),
+        "latency_p95_seconds": percentile(0.95),
+    }
+    for field in USAGE_FIELDS:
+        summary[f"{field}_mean"] = sum(run[field] for run in runs) / len(runs)
+    return summary
+
+
+research_engine_stats = ResearchEngineStats()
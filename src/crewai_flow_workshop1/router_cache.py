@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai_flow_workshop1.tools.search_cache import normalize_query
+
+
+def history_fingerprint(history: List[Any], current_message: str, turns: int = 4) -> str:
+    """
+    Hash of the last `turns` history messages (role and content only, no timestamps).
+
+    The current message is skipped when it is already the last history entry,
+    so the flow (which appends it first) and /api/classify-intent agree on the key.
+    """
+    messages = list(history)
+    if messages and messages[-1].role == "user" and messages[-1].content == current_message:
+        messages = messages[:-1]
+    digest = hashlib.sha256()
+    for message in messages[-turns:] if turns > 0 else []:
+        digest.update(f"{message.role}\x1f{normalize_query(message.content)}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RouterCache:
+    """Thread-safe LRU of router decisions with a TTL, keyed on message plus context fingerprint."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600, turns: int = 4):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.turns = turns
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def key(self, message: str, history: List[Any]) -> str:
+        return f"{normalize_query(message)}|{history_fingerprint(history, message, self.turns)}"
+
+    def get(self, message: str, history: List[Any]) -> Optional[Dict[str, Any]]:
+        key = self.key(message, history)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, message: str, history: List[Any], decision: Dict[str, Any]) -> None:
+        key = self.key(message, history)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(decision))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(
+        self, message: str, history: List[Any], compute: Callable[[], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached decision or compute it once.
+
+        Concurrent callers with the same key (double-submits, classify-then-chat)
+        wait for the first computation instead of issuing their own LLM call.
+        """
+        key = self.key(message, history)
+        while True:
+            cached = self.get(message, history)
+            if cached is not None:
+                return cached
+            with self._lock:
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            decision = compute()
+            if decision is not None:
+                self.set(message, history, decision)
+            return decision
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_router_cache: Optional[RouterCache] = None
+_router_cache_lock = threading.Lock()
+
+
+def get_router_cache() -> RouterCache:
+    """Return the process-wide router decision cache shared by the flow and the API."""
+    global _router_cache
+    with _router_cache_lock:
+        if _router_cache is None:
+            _router_cache = RouterCache(
+                max_entries=int(os.getenv("ROUTER_CACHE_SIZE", "1024")),
+                ttl_seconds=float(os.getenv("ROUTER_CACHE_TTL", "600")),
+                turns=int(os.getenv("ROUTER_CACHE_TURNS", "4")),
+            )
+        return _router_cache
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class Lane:
+    """
+    A pool of worker threads with per-session fair queuing.
+
+    Work is queued per session and workers serve sessions round-robin, so a
+    session that submits many requests only gets its turn like everyone else.
+    At most `per_session` requests of one session run at the same time.
+    """
+
+    def __init__(self, name: str, workers: int, per_session: int = 1):
+        self.name = name
+        self.workers = workers
+        self.per_session = per_session
+        self._queues: "OrderedDict[str, Deque[Tuple[Callable[[], Any], Future, float]]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._condition = threading.Condition()
+        self._waits: Deque[float] = deque(maxlen=500)
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "max_queue_depth": 0}
+        self._depth = 0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"lane-{name}-{index}", daemon=True) for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_key: str, fn: Callable[[], Any]) -> Future:
+        future: Future = Future()
+        with self._condition:
+            self._queues.setdefault(session_key, deque()).append((fn, future, time.monotonic()))
+            self._depth += 1
+            self._counters["submitted"] += 1
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], self._depth)
+            self._condition.notify()
+        return future
+
+    def _next(self) -> Optional[Tuple[str, Callable[[], Any], Future, float]]:
+        # Caller holds self._condition; the first eligible session is served and moves to the back
+        for session_key, queue in self._queues.items():
+            if self._running.get(session_key, 0) >= self.per_session:
+                continue
+            fn, future, queued_at = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session_key)
+            else:
+                del self._queues[session_key]
+            return session_key, fn, future, queued_at
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                item = self._next()
+                while item is None:
+                    self._condition.wait()
+                    item = self._next()
+                session_key, fn, future, queued_at = item
+                self._depth -= 1
+                self._running[session_key] = self._running.get(session_key, 0) + 1
+                self._waits.append(time.monotonic() - queued_at)
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                    outcome = "completed"
+                except BaseException as e:
+                    future.set_exception(e)
+                    outcome = "failed"
+            else:
+                outcome = "completed"
+
+            with self._condition:
+                self._counters[outcome] += 1
+                self._running[session_key] -= 1
+                if not self._running[session_key]:
+                    del self._running[session_key]
+                # A session waiting on its per-session limit may be eligible now
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            waits = sorted(self._waits)
+            stats: Dict[str, Any] = dict(self._counters)
+            stats.update({
+                "workers": self.workers,
+                "per_session": self.per_session,
+                "queue_depth": self._depth,
+                "queued_sessions": len(self._queues),
+                "running": sum(self._running.values()),
+            })
+        stats["wait_mean_seconds"] = sum(waits) / len(waits) if waits else 0.0
+        stats["wait_p95_seconds"] = waits[min(int(0.95 * len(waits)), len(waits) - 1)] if waits else 0.0
+        return stats
+
+
+class Scheduler:
+    """Named, independently sized lanes; quick conversation turns never queue behind research."""
+
+    def __init__(self, lanes: List[Lane]):
+        self.lanes = {lane.name: lane for lane in lanes}
+
+    def submit(self, lane: str, session_key: str, fn: Callable[[], Any]) -> Future:
+        return self.lanes[lane].submit(session_key, fn)
+
+    async def run(self, lane: str, session_key: str, fn: Callable[[], Any]) -> Any:
+        """Run `fn` on a lane and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(lane, session_key, fn))
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Return the process-wide scheduler with a "conversation" lane (routing and
+    conversational replies) and a "research" lane, sized from environment variables.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler([
+                Lane(
+                    "conversation",
+                    workers=int(os.getenv("LANE_CONVERSATION_WORKERS", "8")),
+                    per_session=int(os.getenv("LANE_CONVERSATION_PER_SESSION", "1")),
+                ),
+                Lane(
+                    "research",
+                    workers=int(os.getenv("LANE_RESEARCH_WORKERS", "4")),
+                    per_session=int(os.getenv("LANE_RESEARCH_PER_SESSION", "1")),
+                ),
+            ])
+        return _scheduler
@@ -0,0 +1,307 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from crewai_flow_workshop1.config import data_path
+
+# A page of messages in chronological order and the cursor for the page before it (None at the start)
+MessagePage = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+class SessionStore(abc.ABC):
+    """
+    Storage for chat sessions and their messages.
+
+    Sessions are plain dicts with id, title, createdAt and updatedAt; messages
+    are JSON-serializable dicts appended in order. Implementations must be
+    safe to call from executor threads.
+    """
+
+    @abc.abstractmethod
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session metadata (without messages), or None."""
+
+    @abc.abstractmethod
+    def create_session(self, session_id: str, title: str = "Research Session") -> Dict[str, Any]:
+        """Create or reset a session."""
+
+    @abc.abstractmethod
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Append messages, creating the session if needed."""
+
+    @abc.abstractmethod
+    def list_messages(self, session_id: str, before: Optional[str] = None, limit: int = 50) -> MessagePage:
+        """The newest `limit` messages older than the `before` cursor."""
+
+    @abc.abstractmethod
+    def count_messages(self, session_id: str) -> int:
+        """Number of messages in a session."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _new_session(session_id: str, title: str) -> Dict[str, Any]:
+    now = _now()
+    return {"id": session_id, "title": title, "createdAt": now, "updatedAt": now}
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local LRU of sessions.
+
+    At most `max_sessions` are kept and sessions untouched for `idle_seconds`
+    are dropped, so memory stays bounded. Lost on restart and not shared
+    between workers; use SQLiteSessionStore for that.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_seconds: float = 86400):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, Tuple[Dict[str, Any], List[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self) -> None:
+        # Caller holds self._lock; the least recently used sessions sit at the front
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._sessions:
+            session_id, (_, _, last_access) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and last_access >= cutoff:
+                break
+            del self._sessions[session_id]
+            self.evictions += 1
+
+    def _touch(self, session_id: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], float]]:
+        # Caller holds self._lock
+        self._evict()
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry = self._sessions[session_id] = (entry[0], entry[1], time.monotonic())
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._touch(session_id)
+            return dict(entry[0]) if entry else None
+
+    def create_session(self, session_id: str, title: str = "Research Session") -> Dict[str, Any]:
+        session = _new_session(session_id, title)
+        with self._lock:
+            self._sessions[session_id] = (session, [], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            self._evict()
+        return dict(session)
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                entry = self._sessions[session_id] = (_new_session(session_id, "Research Session"), [], time.monotonic())
+            entry[1].extend(messages)
+            entry[0]["updatedAt"] = _now()
+            self._evict()
+
+    def list_messages(self, session_id: str, before: Optional[str] = None, limit: int = 50) -> MessagePage:
+        with self._lock:
+            entry = self._touch(session_id)
+            messages = entry[1] if entry else []
+            end = min(int(before), len(messages)) if before else len(messages)
+            start = max(end - limit, 0)
+            return list(messages[start:end]), (str(start) if start > 0 else None)
+
+    def count_messages(self, session_id: str) -> int:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return len(entry[1]) if entry else 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "messages": sum(len(entry[1]) for entry in self._sessions.values()),
+                "max_sessions": self.max_sessions,
+                "idle_seconds": self.idle_seconds,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Durable session store in a local SQLite file, shareable by several workers.
+
+    Messages are appended as rows indexed by (session_id, seq), so adding a
+    message and reading one page are both independent of session length.
+    Sessions idle for more than `retention_seconds` are pruned.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_seconds: float = 30 * 86400):
+        self.path = str(path or data_path("chat_sessions.db"))
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_messages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                message TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages (session_id, seq)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_access ON chat_sessions (last_access)")
+        self._conn.commit()
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete sessions (and their messages) idle for longer than the retention period."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT id FROM chat_sessions WHERE last_access < ?", (cutoff,)
+            )]
+            for session_id in expired:
+                self._conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+                self._conn.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+            self._conn.commit()
+        return len(expired)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, created_at, updated_at FROM chat_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE chat_sessions SET last_access = ? WHERE id = ?", (time.time(), session_id))
+            self._conn.commit()
+        return {"id": row[0], "title": row[1], "createdAt": row[2], "updatedAt": row[3]}
+
+    def create_session(self, session_id: str, title: str = "Research Session") -> Dict[str, Any]:
+        session = _new_session(session_id, title)
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (id, title, created_at, updated_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (session_id, title, session["createdAt"], session["updatedAt"], time.time()),
+            )
+            self._conn.commit()
+        return session
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO chat_sessions (id, title, created_at, updated_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (session_id, "Research Session", now, now, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO chat_messages (session_id, message) VALUES (?, ?)",
+                [(session_id, json.dumps(message, default=str)) for message in messages],
+            )
+            self._conn.execute(
+                "UPDATE chat_sessions SET updated_at = ?, last_access = ? WHERE id = ?", (now, time.time(), session_id)
+            )
+            self._conn.commit()
+
+    def list_messages(self, session_id: str, before: Optional[str] = None, limit: int = 50) -> MessagePage:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, message FROM chat_messages WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, int(before) if before else 2 ** 62, limit + 1),
+            ).fetchall()
+        has_more = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+        next_cursor = str(rows[0][0]) if has_more and rows else None
+        return [json.loads(message) for _, message in rows], next_cursor
+
+    def count_messages(self, session_id: str) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM chat_messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (sessions,) = self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()
+            (messages,) = self._conn.execute("SELECT COUNT(*) FROM chat_messages").fetchone()
+        return {"backend": "sqlite", "sessions": sessions, "messages": messages, "retention_seconds": self.retention_seconds}
+
+
+class KeyedLocks:
+    """One lock per key, created on demand and dropped once no thread holds or waits for it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[str, List[Any]] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+
+# Turns of the same session run one at a time so they do not overwrite each other's flow state
+session_locks = KeyedLocks()
+
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Return the process-wide session store.
+
+    SESSION_STORE=memory (default) keeps a bounded in-process LRU;
+    SESSION_STORE=sqlite persists sessions and shares them across workers.
+    """
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            if os.getenv("SESSION_STORE", "memory").strip().lower() == "sqlite":
+                _session_store = SQLiteSessionStore(
+                    path=os.getenv("SESSION_STORE_PATH"),
+                    retention_seconds=float(os.getenv("SESSION_RETENTION", str(30 * 86400))),
+                )
+            else:
+                _session_store = InMemorySessionStore(
+                    max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "1000")),
+                    idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", "86400")),
+                )
+        return _session_store
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is cached:
+    once the work finishes the next caller starts a fresh execution. `do`
+    serves threads and `ado` serves coroutines on one event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def do(self, key: Hashable, fn: Callable[[], Any], check: Optional[Callable[[], None]] = None,
+           poll_interval: float = 0.2) -> Tuple[Any, bool]:
+        """
+        Run `fn` once per key at a time; returns (result, shared) where shared means another call did the work.
+
+        A waiting caller runs `check` every `poll_interval` seconds; whatever it
+        raises (e.g. FlowCancelled) stops the wait without touching the shared work.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._counters["executed"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            while True:
+                try:
+                    return future.result(timeout=poll_interval if check is not None else None), True
+                except FuturesTimeoutError:
+                    check()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of `do`; a waiter that is cancelled does not cancel the shared work."""
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            # Tasks cannot be awaited across event loops; only callers on the same loop coalesce
+            self._count("executed")
+            return await fn(), False
+        shared = task is not None
+        if shared:
+            self._count("coalesced")
+        else:
+            self._count("executed")
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["in_flight"] = len(self._calls) + len(self._tasks)
+        requests = counters["executed"] + counters["coalesced"]
+        counters["coalesced_ratio"] = counters["coalesced"] / requests if requests else 0.0
+        return counters
+
+
+research_flights = SingleFlight()
@@ -0,0 +1,39 @@
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+
+_local = threading.local()
+
+
+@contextmanager
+def stream_tokens_to(sink: Callable[[str], None]) -> Iterator[None]:
+    """
+    Forward text chunks of streaming LLM calls made by this thread to `sink`.
+
+    crewAI publishes chunks on its global event bus from the calling thread,
+    so a thread-local sink keeps concurrent flows from seeing each other's tokens.
+    """
+    previous = getattr(_local, "sink", None)
+    _local.sink = sink
+    try:
+        yield
+    finally:
+        _local.sink = previous
+
+
+def _forward_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    sink: Optional[Callable[[str], None]] = getattr(_local, "sink", None)
+    if sink is not None and event.chunk and event.tool_call is None:
+        sink(event.chunk)
+
+
+crewai_event_bus.register_handler(LLMStreamChunkEvent, _forward_chunk)
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,97 @@
+import json
+import re
+from typing import Any, Dict, List
+
+# Lines that carry no research content (site chrome scraped along with the paper)
+BOILERPLATE_PATTERNS = [
+    r"skip to (main )?content",
+    r"cookie",
+    r"all rights reserved",
+    r"sign (in|up)",
+    r"log ?in",
+    r"subscribe",
+    r"privacy policy",
+    r"terms of (use|service)",
+    r"share (this|on)",
+]
+_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def strip_markup(text: str) -> str:
+    """Remove HTML tags, markdown syntax and boilerplate lines, then collapse whitespace."""
+    if not text:
+        return ""
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", " ", text)  # images
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)  # links keep their label
+    text = re.sub(r"```.*?```", " ", text, flags=re.DOTALL)
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s{0,3}(#{1,6}|[-*+>]|\d+\.)\s+", "", line)
+        line = re.sub(r"[*_`~|]+", "", line).strip()
+        if not line or (len(line) < 80 and _BOILERPLATE_RE.search(line)):
+            continue
+        lines.append(line)
+    return re.sub(r"\s+", " ", " ".join(lines)).strip()
+
+
+def trim(text: str, limit: int) -> str:
+    """Cut text to at most `limit` characters on a word boundary."""
+    if len(text) <= limit:
+        return text
+    if limit <= 3:
+        return text[:limit]
+    cut = text[: limit - 3]
+    if " " in cut:
+        cut = cut[: cut.rfind(" ")]
+    return cut.rstrip(" ,;:") + "..."
+
+
+def compact_results(data: Dict[str, Any], max_total_chars: int = 4000, max_source_chars: int = 600) -> Dict[str, Any]:
+    """
+    Project a Firecrawl search response down to url, title and a trimmed snippet per source.
+
+    The snippet budget is shared fairly: each source gets at most `max_source_chars`
+    and never more than its even share of what is left of `max_total_chars`.
+    Before/after sizes are reported under "metadata".
+    """
+    raw_text = json.dumps(data, default=str)
+    items = (data.get("data") or {}).get("web", [])
+
+    results: List[Dict[str, str]] = []
+    remaining = max_total_chars
+    for index, item in enumerate(items):
+        sources_left = len(items) - index
+        budget = min(max_source_chars, remaining // sources_left) if remaining > 0 else 0
+        title = trim(strip_markup(item.get("title") or ""), 200)
+        snippet = trim(strip_markup(item.get("markdown") or item.get("description") or ""), budget)
+        remaining -= len(snippet)
+        results.append({"url": item.get("url", ""), "title": title, "snippet": snippet})
+
+    compacted: Dict[str, Any] = {"success": True, "results": results}
+    for key in ("queries", "errors"):
+        if data.get(key):
+            compacted[key] = data[key]
+
+    compact_text = json.dumps(compacted)
+    compacted["metadata"] = {
+        "sources": len(results),
+        "raw_chars": len(raw_text),
+        "compact_chars": len(compact_text),
+        "raw_tokens_estimate": estimate_tokens(raw_text),
+        "compact_tokens_estimate": estimate_tokens(compact_text),
+    }
+    return compacted
+
+
+def result_sources(data: Dict[str, Any], max_source_chars: int = 600) -> List[Dict[str, str]]:
+    """url, title and snippet of each source in a compact or raw search response."""
+    if isinstance(data.get("results"), list):
+        return data["results"]
+    items = (data.get("data") or {}).get("web", [])
+    return compact_results(data, max_total_chars=max_source_chars * max(len(items), 1), max_source_chars=max_source_chars)["results"]
@@ -0,0 +1,168 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai_flow_workshop1.config import data_path
+from crewai_flow_workshop1.tools.urls import canonical_url
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "latest", "of", "on", "or", "recent", "research", "studies", "study", "the", "to", "with",
+}
+
+
+def query_terms(text: str) -> List[str]:
+    """Lowercase word tokens of a query, without stopwords or repeats."""
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(term) > 1 and term not in STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+class CorpusIndex:
+    """
+    Local full-text index of every paper returned by Firecrawl.
+
+    Documents are deduplicated by canonical URL and indexed in an SQLite FTS5
+    table over title and snippet; searches are ranked with BM25. A hit only
+    counts towards a local answer when it covers enough of the query terms.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_seconds: Optional[float] = None):
+        self.path = str(path or data_path("corpus_index.db"))
+        self.max_age_seconds = max_age_seconds
+        self.local_answers = 0
+        self.remote_fallbacks = 0
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url_key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                snippet TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_last_seen ON documents (last_seen);
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, snippet, content='documents', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, snippet)
+                VALUES ('delete', old.id, old.title, old.snippet);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, snippet)
+                VALUES ('delete', old.id, old.title, old.snippet);
+                INSERT INTO documents_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def ingest(self, data: Dict[str, Any]) -> int:
+        """Insert or refresh every result of a Firecrawl search response; returns the number of rows written."""
+        now = time.time()
+        rows = []
+        for item in (data.get("data") or {}).get("web", []):
+            url = item.get("url")
+            if not url:
+                continue
+            snippet = item.get("description") or item.get("markdown") or ""
+            rows.append((canonical_url(url), url, item.get("title") or "", snippet, now, now))
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO documents (url_key, url, title, snippet, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    title = excluded.title, snippet = excluded.snippet, last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+            self._conn.commit()
+        if self.max_age_seconds and now - self._last_prune > 3600:
+            self.prune(self.max_age_seconds)
+        return len(rows)
+
+    def search(self, query: str, limit: int = 5, min_coverage: float = 0.0) -> List[Dict[str, Any]]:
+        """BM25-ranked documents matching any query term and covering at least `min_coverage` of them."""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT d.url, d.title, d.snippet, bm25(documents_fts) AS rank
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, limit * 4),
+            ).fetchall()
+
+        hits = []
+        for url, title, snippet, rank in rows:
+            words = set(re.findall(r"[a-z0-9]+", f"{title} {snippet}".lower()))
+            coverage = sum(1 for term in terms if term in words) / len(terms)
+            if coverage >= min_coverage:
+                hits.append({"url": url, "title": title, "description": snippet, "score": -rank, "coverage": coverage})
+        return hits[:limit]
+
+    def answer(self, query: str, limit: int = 5, min_hits: int = 5, min_coverage: float = 0.6) -> Optional[Dict[str, Any]]:
+        """Return a Firecrawl-shaped response from the local index, or None when it has too few good hits."""
+        hits = self.search(query, limit=limit, min_coverage=min_coverage)
+        if len(hits) < min_hits:
+            self.remote_fallbacks += 1
+            return None
+        self.local_answers += 1
+        return {"success": True, "data": {"web": hits}, "source": "local_index"}
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete documents not seen in the last `max_age_seconds`; returns the number removed."""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM documents WHERE last_seen < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            self._last_prune = time.time()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {
+            "documents": documents,
+            "local_answers": self.local_answers,
+            "remote_fallbacks": self.remote_fallbacks,
+        }
+
+
+_corpus_index: Optional[CorpusIndex] = None
+_corpus_index_lock = threading.Lock()
+
+
+def get_corpus_index() -> CorpusIndex:
+    """Return the process-wide corpus index, configured from environment variables."""
+    global _corpus_index
+    with _corpus_index_lock:
+        if _corpus_index is None:
+            max_age_days = os.getenv("DEEP_RESEARCH_CORPUS_MAX_AGE_DAYS")
+            _corpus_index = CorpusIndex(
+                path=os.getenv("DEEP_RESEARCH_CORPUS_PATH"),
+                max_age_seconds=float(max_age_days) * 86400 if max_age_days else None,
+            )
+        return _corpus_index
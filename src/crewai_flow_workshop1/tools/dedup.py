@@ -0,0 +1,150 @@
+import random
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+from crewai_flow_workshop1.tools.urls import paper_identity
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: str, size: int = 4) -> Set[int]:
+    """Hashed character shingles of whitespace- and punctuation-normalized text."""
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))} if text else set()
+    return {zlib.crc32(text[i : i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures with banded LSH bucketing for near-duplicate candidate search."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: Set[int]) -> Tuple[int, ...]:
+        if not shingle_set:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in shingle_set)
+            for a, b in self._perms
+        )
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows : (band + 1) * self.rows]) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+class DedupStats:
+    """Process-wide counters for the source deduplication stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sources_in = 0
+        self.sources_out = 0
+        self.same_paper_dropped = 0
+        self.near_duplicate_dropped = 0
+
+    def add(self, report: Dict[str, int]) -> None:
+        with self._lock:
+            self.sources_in += report["sources_in"]
+            self.sources_out += report["sources_out"]
+            self.same_paper_dropped += report["same_paper_dropped"]
+            self.near_duplicate_dropped += report["near_duplicate_dropped"]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sources_in": self.sources_in,
+                "sources_out": self.sources_out,
+                "same_paper_dropped": self.same_paper_dropped,
+                "near_duplicate_dropped": self.near_duplicate_dropped,
+            }
+
+
+def _is_empty(signature: Tuple[int, ...]) -> bool:
+    return signature[0] == _MAX_HASH and len(set(signature)) == 1
+
+
+def _similar(left: Tuple[int, ...], right: Tuple[int, ...], threshold: float) -> bool:
+    # An empty title or snippet is never evidence of duplication
+    if _is_empty(left) or _is_empty(right):
+        return False
+    return MinHasher.similarity(left, right) >= threshold
+
+
+dedup_stats = DedupStats()
+_hasher = MinHasher()
+
+
+def deduplicate_sources(
+    items: List[Dict[str, Any]],
+    text_key: str = "description",
+    threshold: float = 0.8,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Keep one representative per cluster of duplicate sources.
+
+    Sources first collapse on paper identity (arXiv id, DOI or canonical URL).
+    The survivors are then compared by MinHash over their title and over their
+    text; a pair whose estimated Jaccard similarity reaches `threshold` on either
+    is treated as the same paper. The earliest (best ranked) item of each
+    cluster is kept. Returns the kept items and a report of what was dropped.
+    """
+    report = {"sources_in": len(items), "sources_out": 0, "same_paper_dropped": 0, "near_duplicate_dropped": 0}
+
+    unique: List[Dict[str, Any]] = []
+    seen_identities = set()
+    for item in items:
+        identity = paper_identity(item.get("url") or "")
+        if identity in seen_identities:
+            report["same_paper_dropped"] += 1
+            continue
+        seen_identities.add(identity)
+        unique.append(item)
+
+    kept: List[Dict[str, Any]] = []
+    kept_signatures: List[Tuple[Tuple[int, ...], Tuple[int, ...]]] = []
+    buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for item in unique:
+        title_sig = _hasher.signature(shingles(item.get("title") or ""))
+        text_sig = _hasher.signature(shingles((item.get(text_key) or "")[:500]))
+
+        candidates = set()
+        for field, signature in (("title", title_sig), ("text", text_sig)):
+            for band, key in _hasher.band_keys(signature):
+                candidates.update(buckets.get((field, band, key), []))
+
+        duplicate = any(
+            _similar(title_sig, kept_signatures[index][0], threshold)
+            or _similar(text_sig, kept_signatures[index][1], threshold)
+            for index in candidates
+        )
+        if duplicate:
+            report["near_duplicate_dropped"] += 1
+            continue
+
+        index = len(kept)
+        kept.append(item)
+        kept_signatures.append((title_sig, text_sig))
+        for field, signature in (("title", title_sig), ("text", text_sig)):
+            if _is_empty(signature):
+                continue
+            for band, key in _hasher.band_keys(signature):
+                buckets[(field, band, key)].append(index)
+
+    report["sources_out"] = len(kept)
+    dedup_stats.add(report)
+    return kept, report
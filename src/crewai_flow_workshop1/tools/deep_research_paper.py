@@ -1,11 +1,28 @@
+import asyncio
 import json
 import os
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, List, Optional, Type
 
-import requests
+import httpx
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from crewai_flow_workshop1.budget import LatencyBudget, budget_bound, current_budget
+from crewai_flow_workshop1.cancellation import cancel_bound, check_cancelled
+from crewai_flow_workshop1.config import env_flag
+from crewai_flow_workshop1.tools.compaction import compact_results
+from crewai_flow_workshop1.tools.corpus_index import get_corpus_index
+from crewai_flow_workshop1.tools.dedup import deduplicate_sources
+from crewai_flow_workshop1.tools.firecrawl_replay import get_recorder
+from crewai_flow_workshop1.tools.http_client import get_http_client
+from crewai_flow_workshop1.tools.resilience import CircuitOpenError, get_resilient_caller
+from crewai_flow_workshop1.tools.search_cache import get_search_cache
+from crewai_flow_workshop1.tools.urls import canonical_url
+
+FIRECRAWL_BASE_URL = "https://api.firecrawl.dev"
+CANCEL_POLL_SECONDS = 0.1
+
 
 class DeepResearchPaperInput(BaseModel):
     """Input schema for DeepResearchPaper tool."""
@@ -14,6 +31,11 @@ class DeepResearchPaperInput(BaseModel):
         default="",
         description="Research query to search for academic papers (e.g., 'machine learning transformers', 'agentic ai systems')",
     )
+    queries: Optional[List[str]] = Field(
+        default=None,
+        description="Optional list of several research queries to search in parallel in a single call "
+        "(e.g., ['transformer efficiency', 'sparse attention benchmarks']). Results are merged and deduplicated.",
+    )
     
     @classmethod
     def __init_subclass__(cls, **kwargs):
@@ -23,7 +45,7 @@ class DeepResearchPaperInput(BaseModel):
         # Handle case where agent passes description instead of query
         if 'description' in data and 'query' not in data:
             data['query'] = data.pop('description')
-        elif not data.get('query') and len(data) == 1:
+        elif not data.get('query') and len(data) == 1 and 'queries' not in data:
             # If only one field is passed, use it as query
             data['query'] = list(data.values())[0]
         super().__init__(**data)
@@ -34,74 +56,316 @@ class DeepResearchPaper(BaseTool):
     description: str = (
         "Searches academic and research databases (arXiv, Nature, IEEE, PubMed, etc.) for scholarly papers "
         "related to your query. Returns exactly 5 research papers from the last year with titles, URLs, and descriptions. "
-        "Perfect for literature reviews, research validation, and finding cutting-edge academic work."
+        "Perfect for literature reviews, research validation, and finding cutting-edge academic work. "
+        "To cover several angles at once, pass a list of queries; they are searched in parallel and merged."
     )
     args_schema: Type[BaseModel] = DeepResearchPaperInput
+    base_url: str = Field(default_factory=lambda: os.getenv("FIRECRAWL_BASE_URL", FIRECRAWL_BASE_URL))
+    use_cache: bool = Field(default_factory=lambda: not env_flag("DEEP_RESEARCH_CACHE_DISABLED"))
+    bypass_cache: bool = Field(default_factory=lambda: env_flag("DEEP_RESEARCH_CACHE_BYPASS"))
+    max_concurrency: int = Field(default_factory=lambda: int(os.getenv("DEEP_RESEARCH_MAX_CONCURRENCY", "4")))
+    max_queries: int = Field(default_factory=lambda: int(os.getenv("DEEP_RESEARCH_MAX_QUERIES", "8")))
+    index_results: bool = Field(default_factory=lambda: not env_flag("DEEP_RESEARCH_CORPUS_DISABLED"))
+    local_first: bool = Field(default_factory=lambda: env_flag("DEEP_RESEARCH_LOCAL_FIRST"))
+    local_min_hits: int = Field(default_factory=lambda: int(os.getenv("DEEP_RESEARCH_LOCAL_MIN_HITS", "3")))
+    local_min_coverage: float = Field(default_factory=lambda: float(os.getenv("DEEP_RESEARCH_LOCAL_MIN_COVERAGE", "0.6")))
+    dedupe_sources: bool = Field(default_factory=lambda: env_flag("DEEP_RESEARCH_DEDUP", default=True))
+    compact_output: bool = Field(default_factory=lambda: env_flag("DEEP_RESEARCH_COMPACT_OUTPUT", default=True))
+    max_output_chars: int = Field(default_factory=lambda: int(os.getenv("DEEP_RESEARCH_MAX_OUTPUT_CHARS", "4000")))
+    max_source_chars: int = Field(default_factory=lambda: int(os.getenv("DEEP_RESEARCH_MAX_SOURCE_CHARS", "600")))
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url.rstrip('/')}/v2/search"
 
-    def _run(self, query: str = None, **kwargs) -> str:
+    def _run(self, query: str = None, queries: Optional[List[str]] = None, **kwargs) -> str:
         """
         Search for academic papers using Firecrawl's research category search.
 
         Args:
             query: The research topic to search for
+            queries: Several research topics to search concurrently and merge
 
         Returns:
-            JSON response containing exactly 5 research paper results from the last year
+            Up to 5 research paper results from the last year per query, deduplicated by
+            canonical URL and compacted to url, title and snippet within the output budget
         """
+        all_queries = self._collect_queries(query, queries)
+        # A cancelled flow stops before the Firecrawl calls and before handing results back to the agent
+        check_cancelled("search")
+        if len(all_queries) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(all_queries))) as pool:
+                results = list(pool.map(cancel_bound(budget_bound(self._search)), all_queries))
+            result = self._merge_results(all_queries, results)
+        else:
+            result = self._search(all_queries[0] if all_queries else query, **kwargs)
+        check_cancelled("search")
+        result = self._finalize(result)
+        # Kept so a flow that runs out of time can still answer with what was found
+        budget = current_budget()
+        if budget is not None and isinstance(result, dict):
+            budget.results.append(result)
+        return result
+
+    async def _arun(self, query: str = None, queries: Optional[List[str]] = None, **kwargs) -> str:
+        """
+        Async variant of `_run` that awaits the Firecrawl searches on the running event loop.
+
+        Args:
+            query: The research topic to search for
+            queries: Several research topics to search concurrently and merge
+
+        Returns:
+            Up to 5 research paper results from the last year per query, deduplicated by
+            canonical URL and compacted to url, title and snippet within the output budget
+        """
+        all_queries = self._collect_queries(query, queries)
+        check_cancelled("search")
+        budget = current_budget()
+        if len(all_queries) > 1:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def _bounded_search(single_query: str):
+                async with semaphore:
+                    return await self._asearch_within_budget(budget, single_query)
+
+            results = await self._gather_cancellable([_bounded_search(q) for q in all_queries])
+            result = self._merge_results(all_queries, results)
+        else:
+            single_query = all_queries[0] if all_queries else query
+            (result,) = await self._gather_cancellable([self._asearch_within_budget(budget, single_query, **kwargs)])
+        check_cancelled("search")
+        result = self._finalize(result)
+        # Kept so a flow that runs out of time can still answer with what was found
+        if budget is not None and isinstance(result, dict):
+            budget.results.append(result)
+        return result
+
+    async def _asearch_within_budget(self, budget: Optional[LatencyBudget], query: str = None, **kwargs):
+        # Retries and backoff could outlive the per-request timeouts, so the whole search stops with the budget
+        if budget is None:
+            return await self._asearch(query, **kwargs)
+        try:
+            return await asyncio.wait_for(self._asearch(query, **kwargs), timeout=budget.remaining())
+        except asyncio.TimeoutError:
+            return self._format_error(query, httpx.TimeoutException("Latency budget exhausted"))
+
+    async def _gather_cancellable(self, searches: List[Awaitable[Any]]) -> List[Any]:
+        # The cancel token is polled, not awaitable, so check it while the searches run and abort them when it fires
+        tasks = [asyncio.ensure_future(search) for search in searches]
+        try:
+            pending = tasks
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=CANCEL_POLL_SECONDS)
+                check_cancelled("search")
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return [task.result() for task in tasks]
+
+    def _search(self, query: str = None, **kwargs):
+        try:
+            query = self._resolve_query(query, kwargs)
+            if not query:
+                return "Error: No search query provided. Please provide a research query string."
+
+            payload = self._build_payload(query)
+            cached = self._get_cached(payload)
+            if cached is not None:
+                return cached
+
+            local = self._answer_locally(payload)
+            if local is not None:
+                return local
+
+            # Each sub-query checks again, so a cancelled search stops spending Firecrawl quota
+            check_cancelled("search")
+            headers = self._build_headers()
+            if headers is None:
+                return "Error: FIRECRAWL_API_KEY environment variable is not set. Please set your Firecrawl API key."
+
+            timeout_options = self._timeout_options()
+            response = get_resilient_caller().call(
+                lambda: get_http_client().post(self.search_url, json=payload, headers=headers, **timeout_options)
+            )
+            return self._handle_response(payload, response)
+
+        except Exception as e:
+            return self._format_error(query, e)
+
+    async def _asearch(self, query: str = None, **kwargs):
         try:
-            # Handle different input formats the agent might pass
-            if query is None and kwargs:
-                # Try to extract query from kwargs
-                if 'description' in kwargs:
-                    query = kwargs['description']
-                elif len(kwargs) == 1:
-                    query = list(kwargs.values())[0]
-            
+            query = self._resolve_query(query, kwargs)
             if not query:
                 return "Error: No search query provided. Please provide a research query string."
-                
-            # Fixed limit of 5 research papers
-            limit = 5
-
-            url = "https://api.firecrawl.dev/v2/search"
-
-            payload = {
-                "query": query,
-                "sources": ["web"],
-                "categories": ["research"],
-                "tbs": "qdr:y",  # Search within last year
-                "limit": limit,
-            }
-
-            # Get API key from environment variable
-            api_key = os.getenv("FIRECRAWL_API_KEY")
-            if not api_key:
+
+            payload = self._build_payload(query)
+            cached = self._get_cached(payload)
+            if cached is not None:
+                return cached
+
+            local = self._answer_locally(payload)
+            if local is not None:
+                return local
+
+            check_cancelled("search")
+            headers = self._build_headers()
+            if headers is None:
                 return "Error: FIRECRAWL_API_KEY environment variable is not set. Please set your Firecrawl API key."
 
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
+            timeout_options = self._timeout_options()
+            response = await get_resilient_caller().acall(
+                lambda: get_http_client().apost(self.search_url, json=payload, headers=headers, **timeout_options)
+            )
+            return self._handle_response(payload, response)
+
+        except Exception as e:
+            return self._format_error(query, e)
+
+    def _collect_queries(self, query: Optional[str], queries: Optional[List[str]]) -> List[str]:
+        # Combine the single query and the query list, dropping blanks and repeats
+        collected = []
+        for candidate in [query] + list(queries or []):
+            if isinstance(candidate, str) and candidate.strip() and candidate.strip() not in collected:
+                collected.append(candidate.strip())
+        return collected[: self.max_queries]
+
+    def _merge_results(self, queries: List[str], results: List[Any]) -> Dict[str, Any]:
+        # Keep the first occurrence of every paper across all queries
+        merged = []
+        seen_urls = set()
+        errors = []
+        for single_query, result in zip(queries, results):
+            if isinstance(result, str):
+                errors.append(result)
+                continue
+            for item in (result.get("data") or {}).get("web", []):
+                url = item.get("url")
+                if not url:
+                    continue
+                key = canonical_url(url)
+                if key in seen_urls:
+                    continue
+                seen_urls.add(key)
+                merged.append({**item, "query": single_query})
+
+        if not merged and errors:
+            return f"Search failed for all queries: {'; '.join(errors)}"
+
+        return {
+            "success": True,
+            "data": {"web": merged},
+            "queries": queries,
+            "errors": errors,
+        }
 
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
+    def _finalize(self, result: Any) -> Any:
+        # Error strings pass through untouched; raw responses are deduplicated and projected for the LLM
+        if not isinstance(result, dict):
+            return result
 
-            data = response.json()
+        report = None
+        if self.dedupe_sources:
+            items, report = deduplicate_sources((result.get("data") or {}).get("web", []))
+            result = {**result, "data": {**(result.get("data") or {}), "web": items}}
 
-            if not data.get("success", False):
-                return f"Search failed: {data.get('error', 'Unknown error occurred')}"
+        if self.compact_output:
+            result = compact_results(result, self.max_output_chars, self.max_source_chars)
+            if report is not None:
+                result["metadata"]["deduplication"] = report
+        elif report is not None:
+            result["deduplication"] = report
+        return result
 
-            else:
-                return data
+    def _resolve_query(self, query: Optional[str], kwargs: Dict[str, Any]) -> Optional[str]:
+        # Handle different input formats the agent might pass
+        if query is None and kwargs:
+            # Try to extract query from kwargs
+            if 'description' in kwargs:
+                query = kwargs['description']
+            elif len(kwargs) == 1:
+                query = list(kwargs.values())[0]
+        return query
 
-        except requests.exceptions.Timeout:
+    def _build_payload(self, query: str) -> Dict[str, Any]:
+        # Fixed limit of 5 research papers
+        limit = 5
+
+        return {
+            "query": query,
+            "sources": ["web"],
+            "categories": ["research"],
+            "tbs": "qdr:y",  # Search within last year
+            "limit": limit,
+        }
+
+    def _get_cached(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Serve repeated queries from the local cache; bypass still refreshes the entry.
+        # Record mode always asks Firecrawl so every query ends up with a fixture.
+        if self.use_cache and not self.bypass_cache and get_recorder() is None:
+            return get_search_cache().get(payload)
+        return None
+
+    def _answer_locally(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Local-first mode answers from previously retrieved papers when the index has enough good hits;
+        # those answers are not real API responses, so record mode skips the index
+        if not self.local_first or get_recorder() is not None:
+            return None
+        return get_corpus_index().answer(
+            payload["query"],
+            limit=payload["limit"],
+            min_hits=self.local_min_hits,
+            min_coverage=self.local_min_coverage,
+        )
+
+    def _timeout_options(self) -> Dict[str, Any]:
+        # Under a latency budget the request may not outlive it
+        budget = current_budget()
+        if budget is None:
+            return {}
+        client_timeout = get_http_client().timeout
+        return {"timeout": httpx.Timeout(budget.timeout(client_timeout.read), connect=budget.timeout(client_timeout.connect))}
+
+    def _build_headers(self) -> Optional[Dict[str, str]]:
+        # Get API key from environment variable
+        api_key = os.getenv("FIRECRAWL_API_KEY")
+        if not api_key:
+            return None
+
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _handle_response(self, payload: Dict[str, Any], response: httpx.Response):
+        response.raise_for_status()
+
+        data = response.json()
+
+        if not data.get("success", False):
+            return f"Search failed: {data.get('error', 'Unknown error occurred')}"
+
+        if self.use_cache:
+            get_search_cache().set(payload, data)
+        if self.index_results:
+            get_corpus_index().ingest(data)
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record(payload, data)
+        return data
+
+    def _format_error(self, query: Optional[str], error: Exception) -> str:
+        if isinstance(error, CircuitOpenError):
+            return f"Search temporarily unavailable for query '{query}': the research API is failing, please try again shortly."
+
+        if isinstance(error, httpx.TimeoutException):
             return f"Search timeout for query '{query}'. Please try again with a more specific query."
 
-        except requests.exceptions.RequestException as e:
-            return f"Network error while searching for '{query}': {str(e)}"
+        if isinstance(error, httpx.HTTPError):
+            return f"Network error while searching for '{query}': {str(error)}"
 
-        except json.JSONDecodeError:
+        if isinstance(error, json.JSONDecodeError):
             return f"Invalid response format from search API for query '{query}'. Please try again."
 
-        except Exception as e:
-            return f"Unexpected error during research search for '{query}': {str(e)}"
+        return f"Unexpected error during research search for '{query}': {str(error)}"
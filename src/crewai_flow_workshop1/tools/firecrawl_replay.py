@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Record/replay support for the Firecrawl search API.
+
+Set DEEP_RESEARCH_RECORD_DIR to make DeepResearchPaper save every real
+/v2/search response as a fixture. While recording, the tool skips the search
+cache and the local-first corpus index, so every query reaches Firecrawl and
+gets a fixture (cached and indexed answers would otherwise be missing on
+replay). Then serve those fixtures locally:
+
+    python -m crewai_flow_workshop1.tools.firecrawl_replay --fixtures ./fixtures --latency 0.5 --error-rate 0.05
+
+and point the tool at the stand-in with FIRECRAWL_BASE_URL=http://127.0.0.1:8787.
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from crewai_flow_workshop1.tools.search_cache import cache_key
+
+
+class FixtureStore:
+    """Directory of recorded search responses, one JSON file per request key."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, payload: Dict[str, Any]) -> Path:
+        return self.directory / f"{cache_key(payload)}.json"
+
+    def record(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Save a real response so it can be replayed later."""
+        fixture = {"request": payload, "response": response, "recorded_at": time.time()}
+        with self._lock:
+            self.path_for(payload).write_text(json.dumps(fixture, indent=2), encoding="utf-8")
+
+    def load(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the recorded response for a payload, or None if it was never recorded."""
+        path = self.path_for(payload)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["response"]
+
+    def any_fixture(self, rng: random.Random) -> Optional[Dict[str, Any]]:
+        """Return a random recorded response, used when the stand-in serves unknown queries."""
+        paths = sorted(self.directory.glob("*.json"))
+        if not paths:
+            return None
+        return json.loads(rng.choice(paths).read_text(encoding="utf-8"))["response"]
+
+
+_recorder: Optional[FixtureStore] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[FixtureStore]:
+    """Return the fixture recorder when record mode is enabled via DEEP_RESEARCH_RECORD_DIR."""
+    global _recorder
+    record_dir = os.getenv("DEEP_RESEARCH_RECORD_DIR")
+    if not record_dir:
+        return None
+    with _recorder_lock:
+        if _recorder is None or _recorder.directory != Path(record_dir):
+            _recorder = FixtureStore(record_dir)
+        return _recorder
+
+
+class StandInConfig:
+    def __init__(self, store: FixtureStore, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, fallback_any: bool = False, seed: Optional[int] = None):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fallback_any = fallback_any
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+
+def make_handler(config: StandInConfig):
+    class FirecrawlStandInHandler(BaseHTTPRequestHandler):
+        # Keep-alive, like the real API, so connection reuse shows up in benchmarks
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v2/search":
+                self._send(404, {"success": False, "error": f"Unknown endpoint {self.path}"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {"success": False, "error": "Invalid JSON body"})
+                return
+
+            with config.rng_lock:
+                delay = max(0.0, config.latency + config.rng.uniform(-config.jitter, config.jitter))
+                fail = config.rng.random() < config.error_rate
+                status = config.rng.choice([429, 500, 502, 503])
+            time.sleep(delay)
+
+            if fail:
+                self._send(status, {"success": False, "error": "Injected stand-in failure"})
+                return
+
+            response = config.store.load(payload)
+            if response is None and config.fallback_any:
+                with config.rng_lock:
+                    response = config.store.any_fixture(config.rng)
+            if response is None:
+                self._send(404, {"success": False, "error": f"No fixture recorded for query '{payload.get('query')}'"})
+                return
+            self._send(200, response)
+
+        def _send(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FirecrawlStandInHandler
+
+
+def serve(config: StandInConfig, host: str = "127.0.0.1", port: int = 8787) -> ThreadingHTTPServer:
+    """Create the stand-in server; call serve_forever() on the result to run it."""
+    return ThreadingHTTPServer((host, port), make_handler(config))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded Firecrawl search fixtures locally")
+    parser.add_argument("--fixtures", default=os.getenv("DEEP_RESEARCH_RECORD_DIR", "fixtures/firecrawl"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/5xx")
+    parser.add_argument("--fallback-any", action="store_true", help="Serve a random fixture for unknown queries")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        FixtureStore(args.fixtures),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        fallback_any=args.fallback_any,
+        seed=args.seed,
+    )
+    server = serve(config, args.host, args.port)
+    print(f"Firecrawl stand-in serving {args.fixtures} at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
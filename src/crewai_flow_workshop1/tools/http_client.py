@@ -0,0 +1,134 @@
+import asyncio
+import os
+import threading
+import warnings
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from crewai_flow_workshop1.config import env_flag
+
+
+class PooledHttpClient:
+    """
+    Process-wide HTTP client with connection pooling and keep-alive.
+
+    Wraps a single `httpx.Client`, which is safe to share between the executor
+    threads of the API server, plus one `httpx.AsyncClient` per event loop for
+    async callers. Every request is traced so the pool statistics show how
+    many requests reused an already open connection.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        http2: bool = False,
+    ):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                warnings.warn("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+                http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http2 = http2
+        self.client = httpx.Client(limits=self.limits, timeout=self.timeout, http2=http2)
+        # Async connections are bound to the loop that opened them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections_opened = 0
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._connections_opened += 1
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request over the shared connection pool."""
+        with self._lock:
+            self._requests += 1
+        extensions = kwargs.pop("extensions", {})
+        extensions["trace"] = self._trace
+        return self.client.post(url, extensions=extensions, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request without blocking the running event loop."""
+        with self._lock:
+            self._requests += 1
+        extensions = kwargs.pop("extensions", {})
+        extensions["trace"] = self._atrace
+        return await self._get_async_client().post(url, extensions=extensions, **kwargs)
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+                self._async_clients[loop] = client
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request and connection counters for the pool."""
+        with self._lock:
+            requests = self._requests
+            opened = self._connections_opened
+        reused = max(requests - opened, 0)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / requests if requests else 0.0,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "http2": self.http2,
+        }
+
+    def close(self) -> None:
+        self.client.close()
+
+    async def aclose(self) -> None:
+        """Close the async client bound to the running event loop, if any."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_http_client: Optional[PooledHttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHttpClient:
+    """Return the process-wide pooled client, configured from environment variables."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = PooledHttpClient(
+                max_connections=int(os.getenv("FIRECRAWL_POOL_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("FIRECRAWL_POOL_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("FIRECRAWL_KEEPALIVE_EXPIRY", "30")),
+                connect_timeout=float(os.getenv("FIRECRAWL_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("FIRECRAWL_READ_TIMEOUT", "30")),
+                http2=env_flag("FIRECRAWL_HTTP2"),
+            )
+        return _http_client
@@ -0,0 +1,400 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from crewai_flow_workshop1.budget import current_budget
+from crewai_flow_workshop1.config import env_flag
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds; then a single trial call is let
+    through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.short_circuited = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.short_circuited += 1
+                    raise CircuitOpenError("Firecrawl circuit breaker is open")
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    self.short_circuited += 1
+                    raise CircuitOpenError("Firecrawl circuit breaker is half-open, trial call in progress")
+                self._trial_in_flight = True
+
+    def release(self) -> None:
+        """End a call that was cancelled before it said anything about the upstream."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """Token bucket enforcing a client-side request rate; a rate of 0 disables it."""
+
+    def __init__(self, rate_per_second: float = 0.0, burst: int = 1):
+        self.rate = rate_per_second
+        self.burst = max(burst, 1)
+        self.waits = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            self.waits += 1
+            return -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class ResilientCaller:
+    """
+    Wraps Firecrawl HTTP calls with rate limiting, a circuit breaker,
+    jittered exponential-backoff retries on 429/5xx and optional hedging.
+
+    Hedging fires a duplicate request once the first one has been outstanding
+    longer than the recent p95 latency and keeps whichever answers first. The
+    duplicate needs its own rate-limit token and a closed circuit; without
+    them the call just keeps waiting for the first request.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20,
+        hedge_workers: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.latency = LatencyTracker()
+        # Hedged blocking calls run both requests on this pool; sized like the connection pool so it never caps concurrency below it
+        self._hedge_pool = (
+            ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="firecrawl-hedge") if hedge else None
+        )
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "retries": 0, "hedges_fired": 0, "hedges_skipped": 0, "hedge_wins": 0,
+                          "failures": 0, "retries_skipped_for_budget": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(95) or 0.0)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_fits_budget(self, delay: float) -> bool:
+        # A caller with a latency budget would rather have the failure now than a retry that arrives too late
+        budget = current_budget()
+        if budget is None or budget.allows(delay + 1.0):
+            return True
+        self._count("retries_skipped_for_budget")
+        return False
+
+    def _hedge_allowed(self) -> bool:
+        # A hedge is a second upstream request: it must fit the rate limit and not probe a failing API
+        if self.breaker.state == "closed" and self.rate_limiter.try_acquire():
+            return True
+        self._count("hedges_skipped")
+        return False
+
+    def _is_failure(self, response: httpx.Response) -> bool:
+        return response.status_code in RETRYABLE_STATUSES
+
+    def call(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Run a blocking request function with the full resilience policy."""
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            try:
+                self.rate_limiter.acquire()
+                response = self._send_hedged(send)
+            except httpx.TransportError:
+                self._record_failure()
+                delay = self._backoff(attempt, None)
+                if attempt == self.max_retries or not self._retry_fits_budget(delay):
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            except Exception:
+                self._record_failure()
+                raise
+            except BaseException:
+                # Cancelled (FlowCancelled, BudgetExhausted): no verdict on the upstream, but free a half-open trial
+                self.breaker.release()
+                raise
+
+            if not self._is_failure(response):
+                self.breaker.record_success()
+                return response
+            self._record_failure()
+            delay = self._backoff(attempt, response)
+            if attempt == self.max_retries or not self._retry_fits_budget(delay):
+                return response
+            self._count("retries")
+            time.sleep(delay)
+        return response
+
+    async def acall(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Async counterpart of `call` for coroutine request functions."""
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            try:
+                await self.rate_limiter.aacquire()
+                response = await self._asend_hedged(send)
+            except httpx.TransportError:
+                self._record_failure()
+                delay = self._backoff(attempt, None)
+                if attempt == self.max_retries or not self._retry_fits_budget(delay):
+                    raise
+                self._count("retries")
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self._record_failure()
+                raise
+            except BaseException:
+                # Cancelled (CancelledError, FlowCancelled, BudgetExhausted): no verdict, but free a half-open trial
+                self.breaker.release()
+                raise
+
+            if not self._is_failure(response):
+                self.breaker.record_success()
+                return response
+            self._record_failure()
+            delay = self._backoff(attempt, response)
+            if attempt == self.max_retries or not self._retry_fits_budget(delay):
+                return response
+            self._count("retries")
+            await asyncio.sleep(delay)
+        return response
+
+    def _record_failure(self) -> None:
+        self._count("failures")
+        self.breaker.record_failure()
+
+    def _timed(self, send: Callable[[], httpx.Response], running: Optional[threading.Event] = None) -> httpx.Response:
+        if running is not None:
+            running.set()
+        started = time.monotonic()
+        response = send()
+        self.latency.record(time.monotonic() - started)
+        return response
+
+    def _send_hedged(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed(send)
+
+        # The hedge delay counts from when the request is sent, not from when it was queued for a worker
+        running = threading.Event()
+        primary = self._hedge_pool.submit(self._timed, send, running)
+        running.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._hedge_allowed():
+            return primary.result()
+
+        self._count("hedges_fired")
+        hedged = self._hedge_pool.submit(self._timed, send)
+        done, pending = wait([primary, hedged], return_when=FIRST_COMPLETED)
+        # Blocking requests cannot be aborted; the slower one finishes in the background
+        winner = primary if primary in done else hedged
+        if winner.exception() is not None and pending:
+            # The first one failed, but the other may still succeed
+            other = hedged if winner is primary else primary
+            if other.exception() is None:
+                winner = other
+        if winner is hedged:
+            self._count("hedge_wins")
+        return winner.result()
+
+    async def _atimed(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        started = time.monotonic()
+        response = await send()
+        self.latency.record(time.monotonic() - started)
+        return response
+
+    async def _asend_hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._atimed(send)
+
+        primary = asyncio.ensure_future(self._atimed(send))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done or not self._hedge_allowed():
+            return await primary
+
+        self._count("hedges_fired")
+        hedged = asyncio.ensure_future(self._atimed(send))
+        done, pending = await asyncio.wait([primary, hedged], return_when=asyncio.FIRST_COMPLETED)
+        winner = primary if primary in done else hedged
+        if winner.exception() is not None and pending:
+            # The first one failed, but the other may still succeed
+            other = hedged if winner is primary else primary
+            await asyncio.wait([other])
+            if other.exception() is None:
+                winner = other
+        for task in (primary, hedged):
+            if not task.done():
+                task.cancel()
+        if winner is hedged:
+            self._count("hedge_wins")
+        return winner.result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "circuit_state": self.breaker.state,
+            "short_circuited": self.breaker.short_circuited,
+            "rate_limited_waits": self.rate_limiter.waits,
+            "latency_p50": self.latency.percentile(50),
+            "latency_p95": self.latency.percentile(95),
+            "hedge_enabled": self.hedge,
+        }
+
+
+_resilient_caller: Optional[ResilientCaller] = None
+_resilient_caller_lock = threading.Lock()
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """Return the process-wide resilience policy for Firecrawl, configured from environment variables."""
+    global _resilient_caller
+    with _resilient_caller_lock:
+        if _resilient_caller is None:
+            _resilient_caller = ResilientCaller(
+                max_retries=int(os.getenv("FIRECRAWL_MAX_RETRIES", "2")),
+                backoff_base=float(os.getenv("FIRECRAWL_BACKOFF_BASE", "0.5")),
+                backoff_max=float(os.getenv("FIRECRAWL_BACKOFF_MAX", "8")),
+                hedge=env_flag("FIRECRAWL_HEDGE"),
+                hedge_min_delay=float(os.getenv("FIRECRAWL_HEDGE_MIN_DELAY", "0.5")),
+                hedge_workers=int(os.getenv("FIRECRAWL_POOL_MAX_CONNECTIONS", "20")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("FIRECRAWL_BREAKER_THRESHOLD", "5")),
+                    reset_timeout=float(os.getenv("FIRECRAWL_BREAKER_RESET", "30")),
+                ),
+                rate_limiter=RateLimiter(
+                    rate_per_second=float(os.getenv("FIRECRAWL_RATE_LIMIT", "0")),
+                    burst=int(os.getenv("FIRECRAWL_RATE_BURST", "5")),
+                ),
+            )
+        return _resilient_caller
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from crewai_flow_workshop1.config import data_path
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, trim punctuation and collapse whitespace so near-identical queries share a key."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.strip(" .,;:!?\"'")
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Build a stable cache key from the normalized query and the search parameters."""
+    key_data = {
+        "query": normalize_query(payload.get("query", "")),
+        "tbs": payload.get("tbs"),
+        "limit": payload.get("limit"),
+        "categories": sorted(payload.get("categories") or []),
+        "sources": sorted(payload.get("sources") or []),
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    SQLite-backed cache for Firecrawl search responses.
+
+    Entries expire after `ttl_seconds` and the table is kept at `max_entries`
+    rows by evicting the least recently used entries. A single connection is
+    shared behind a lock, so the cache is safe to use from executor threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 86400, max_entries: int = 5000):
+        self.path = str(path or data_path("search_cache.db"))
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a payload, or None on a miss or expired entry."""
+        key = cache_key(payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(response)
+
+    def set(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Store a response and evict least recently used entries beyond `max_entries`."""
+        key = cache_key(payload)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload.get("query", ""), json.dumps(response), now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN "
+                    "(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, configured from environment variables."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                path=os.getenv("DEEP_RESEARCH_CACHE_PATH"),
+                ttl_seconds=float(os.getenv("DEEP_RESEARCH_CACHE_TTL", "86400")),
+                max_entries=int(os.getenv("DEEP_RESEARCH_CACHE_MAX_ENTRIES", "5000")),
+            )
+        return _search_cache
@@ -0,0 +1,56 @@
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from. Generic names such as
+# "source" or "ref" are kept: on repository and viewer pages they select the content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "ref_src", "spm", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different links to the same page compare equal.
+
+    Forces https, lowercases the host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the remaining query.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+_ARXIV_ID_RE = re.compile(r"/(?:abs|pdf|html|format)/((?:\d{4}\.\d{4,5})|(?:[a-z\-]+(?:\.[a-z]{2})?/\d{7}))(?:v\d+)?(?:\.pdf)?", re.IGNORECASE)
+_DOI_RE = re.compile(r"(10\.\d{4,9}/[^\s?#]+)", re.IGNORECASE)
+
+
+def paper_identity(url: str) -> str:
+    """
+    Identity of the paper behind a URL, so abstract pages, PDFs and mirrors collapse.
+
+    arXiv links (abs/pdf/html, any version suffix, any *arxiv.org or ar5iv mirror)
+    map to "arxiv:<id>", links carrying a DOI map to "doi:<doi>", and everything
+    else falls back to the canonical URL.
+    """
+    canonical = canonical_url(url)
+    parts = urlsplit(canonical)
+    host = parts.hostname or ""
+    if host.endswith("arxiv.org") or host.endswith("ar5iv.org"):
+        match = _ARXIV_ID_RE.search(parts.path)
+        if match:
+            return f"arxiv:{match.group(1).lower()}"
+    match = _DOI_RE.search(unquote(parts.path))
+    if match:
+        doi = re.sub(r"(\.pdf|/full|/abstract|/epdf)$", "", match.group(1).lower())
+        return f"doi:{doi}"
+    return canonical
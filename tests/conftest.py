@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep flow states, caches and logs written at import time out of the developer's data directory
+_data_dir = tempfile.mkdtemp(prefix="crewai-flow-tests-")
+os.environ.setdefault("CREWAI_FLOW_DATA_DIR", _data_dir)
+os.environ.setdefault("CREWAI_STORAGE_DIR", _data_dir)
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+from crewai_flow_workshop1 import history_window
+from crewai_flow_workshop1.cancellation import FlowCancelled
+from crewai_flow_workshop1.history_window import HistoryWindow
+
+
+def _messages(count):
+    return [SimpleNamespace(role="user" if i % 2 == 0 else "assistant", content=f"message {i}") for i in range(count)]
+
+
+def test_render_without_messages():
+    assert HistoryWindow().render([]) == "(no previous messages)"
+
+
+def test_render_keeps_newest_turns_and_summary():
+    window = HistoryWindow(max_turns=2)
+    rendered = window.render(_messages(5), summary="earlier talk")
+    assert rendered == "Summary of earlier conversation: earlier talk\nassistant: message 3\nuser: message 4"
+
+
+def test_render_excludes_current_message_and_respects_budget():
+    window = HistoryWindow(max_turns=10, max_tokens=10)
+    messages = _messages(4) + [SimpleNamespace(role="user", content="the question")]
+    rendered = window.render(messages, exclude_message="the question")
+    assert "the question" not in rendered
+    assert rendered.endswith("assistant: message 3")
+    assert "message 0" not in rendered
+
+
+def test_render_keeps_messages_waiting_for_the_next_fold():
+    window = HistoryWindow(max_turns=2, max_tokens=1000)
+    rendered = window.render(_messages(6), summarized_count=1)
+    assert rendered.splitlines()[0] == "assistant: message 1"
+    assert len(rendered.splitlines()) == 5
+
+
+def test_pending_waits_for_a_full_batch():
+    window = HistoryWindow(max_turns=2, summary_batch=3)
+    messages = _messages(4)
+    assert window.pending(messages, 0) == ([], 0)
+
+    messages = _messages(5)
+    folded, summarized_count = window.pending(messages, 0)
+    assert summarized_count == 3
+    assert [m.content for m in folded] == ["message 0", "message 1", "message 2"]
+    assert window.pending(messages, summarized_count) == ([], 3)
+
+
+def test_fold_extractive_appends_and_trims():
+    window = HistoryWindow(summary_max_tokens=10, summary_model=None)
+    assert window.fold("kept", []) == "kept"
+    assert window.fold("", _messages(2)) == "user: message 0 | assistant: message 1"
+
+    folded = window.fold("old summary", _messages(6))
+    assert len(folded) == 40
+    assert folded.startswith("...")
+    assert folded.endswith("assistant: message 5")
+
+
+class _FakeLLM:
+    def __init__(self, reply=None, error=None):
+        self.reply = reply
+        self.error = error
+        self.prompts = []
+
+    def call(self, prompt):
+        self.prompts.append(prompt)
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+def test_fold_uses_summary_model(monkeypatch):
+    llm = _FakeLLM(reply="  The user asked   about   sparse attention. ")
+    monkeypatch.setattr(history_window, "get_llm", lambda *args, **kwargs: llm)
+    window = HistoryWindow(summary_model="test-model")
+
+    assert window.fold("previous", _messages(2)) == "The user asked about sparse attention."
+    assert "previous" in llm.prompts[0]
+    assert "assistant: message 1" in llm.prompts[0]
+
+
+def test_fold_skips_model_when_not_allowed(monkeypatch):
+    llm = _FakeLLM(reply="unused")
+    monkeypatch.setattr(history_window, "get_llm", lambda *args, **kwargs: llm)
+    window = HistoryWindow(summary_model="test-model")
+
+    assert window.fold("", _messages(1), use_llm=False) == "user: message 0"
+    assert llm.prompts == []
+
+
+def test_fold_falls_back_when_model_fails_or_is_cancelled(monkeypatch):
+    window = HistoryWindow(summary_model="test-model")
+    for error in (RuntimeError("down"), FlowCancelled("stop", "history_fold")):
+        llm = _FakeLLM(error=error)
+        monkeypatch.setattr(history_window, "get_llm", lambda *args, **kwargs: llm)
+        assert window.fold("", _messages(1)) == "user: message 0"
@@ -0,0 +1,34 @@
+import importlib
+
+import pytest
+
+MODULES = [
+    "crewai_flow_workshop1.main",
+    "crewai_flow_workshop1.api_server",
+    "crewai_flow_workshop1.batch_router",
+    "crewai_flow_workshop1.budget",
+    "crewai_flow_workshop1.cancellation",
+    "crewai_flow_workshop1.history_window",
+    "crewai_flow_workshop1.intent_classifier",
+    "crewai_flow_workshop1.jobs",
+    "crewai_flow_workshop1.persistence",
+    "crewai_flow_workshop1.prefetch",
+    "crewai_flow_workshop1.single_flight",
+    "crewai_flow_workshop1.streaming",
+    "crewai_flow_workshop1.tools.dedup",
+    "crewai_flow_workshop1.tools.resilience",
+    "crewai_flow_workshop1.tools.urls",
+]
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_module_imports(name):
+    importlib.import_module(name)
+
+
+def test_api_app_and_flow_are_exposed():
+    from crewai_flow_workshop1.api_server import app
+    from crewai_flow_workshop1.main import DeepResearchFlow
+
+    assert app is not None
+    assert DeepResearchFlow is not None
@@ -0,0 +1,65 @@
+import copy
+
+from crewai_flow_workshop1.persistence import DeltaFlowPersistence, apply_delta, state_delta
+
+
+def test_state_delta_round_trip():
+    previous = {"query": "a", "message_history": [{"role": "user", "content": "hi"}], "count": 1, "tags": ["x", "y"]}
+    current = {
+        "query": "b",
+        "message_history": [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}],
+        "count": 1,
+        "tags": ["y"],
+        "new_field": None,
+    }
+    changed, appended = state_delta(previous, current)
+
+    assert changed == {"query": "b", "tags": ["y"], "new_field": None}
+    assert appended == {"message_history": [{"role": "assistant", "content": "hello"}]}
+    assert apply_delta(copy.deepcopy(previous), changed, appended) == current
+
+
+def test_state_delta_from_nothing_is_the_full_state():
+    current = {"query": "a", "message_history": []}
+    changed, appended = state_delta(None, current)
+    assert changed == current
+    assert appended == {}
+    assert apply_delta({}, changed, appended) == current
+
+
+def test_state_delta_unchanged_state_is_empty():
+    state = {"query": "a", "message_history": [1, 2]}
+    assert state_delta(state, copy.deepcopy(state)) == ({}, {})
+
+
+def _store(tmp_path, **kwargs):
+    return DeltaFlowPersistence(db_path=str(tmp_path / "deltas.db"), flush_interval=60, **kwargs)
+
+
+def test_saved_states_replay_from_disk(tmp_path):
+    writer = _store(tmp_path, compact_every=3)
+    history = []
+    for turn in range(7):
+        history.append({"role": "user", "content": f"message {turn}"})
+        writer.save_state("flow-1", "step", {"id": "flow-1", "turn": turn, "message_history": list(history)})
+    writer.flush()
+
+    reader = _store(tmp_path)
+    assert reader.load_state("flow-1") == {"id": "flow-1", "turn": 6, "message_history": history}
+    assert writer.stats()["compactions"] >= 1
+    assert reader.load_state("missing") is None
+
+
+def test_cached_state_is_reloaded_after_another_writer(tmp_path):
+    first = _store(tmp_path)
+    second = _store(tmp_path)
+    first.save_state("flow-1", "step", {"turn": 1})
+    first.flush()
+    assert second.load_state("flow-1") == {"turn": 1}
+    assert first.load_state("flow-1") == {"turn": 1}
+    assert first.stats()["loads_from_memory"] == 1
+
+    second.save_state("flow-1", "step", {"turn": 2})
+    second.flush()
+    assert first.load_state("flow-1") == {"turn": 2}
+    assert first.stats()["stale_cache_reloads"] == 1
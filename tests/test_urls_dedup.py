@@ -0,0 +1,58 @@
+from crewai_flow_workshop1.tools.dedup import deduplicate_sources
+from crewai_flow_workshop1.tools.urls import canonical_url, paper_identity
+
+
+def test_canonical_url_normalizes_trivial_differences():
+    assert canonical_url("http://WWW.Example.com:443/papers/?b=2&a=1#section") == "https://example.com/papers?a=1&b=2"
+    assert canonical_url("https://example.com:8080/x/") == "https://example.com:8080/x"
+    assert canonical_url("https://example.com") == "https://example.com/"
+
+
+def test_canonical_url_drops_tracking_parameters():
+    url = "https://example.com/post?id=7&utm_source=news&utm_medium=mail&fbclid=abc&gclid=def"
+    assert canonical_url(url) == "https://example.com/post?id=7"
+
+
+def test_canonical_url_keeps_content_bearing_parameters():
+    assert canonical_url("https://github.com/org/repo/blob/main/x.py?ref=v2") == "https://github.com/org/repo/blob/main/x.py?ref=v2"
+    assert canonical_url("https://viewer.example.org/doc?source=paper.pdf") == "https://viewer.example.org/doc?source=paper.pdf"
+
+
+def test_paper_identity_collapses_arxiv_variants():
+    identities = {
+        paper_identity("https://arxiv.org/abs/2401.12345"),
+        paper_identity("https://arxiv.org/pdf/2401.12345v2.pdf"),
+        paper_identity("http://export.arxiv.org/abs/2401.12345v1"),
+        paper_identity("https://www.arxiv.org/html/2401.12345v3"),
+    }
+    assert identities == {"arxiv:2401.12345"}
+
+
+def test_paper_identity_uses_doi():
+    assert paper_identity("https://doi.org/10.1000/XYZ.123") == "doi:10.1000/xyz.123"
+    assert paper_identity("https://publisher.com/doi/full/10.1000/xyz.123/full") == "doi:10.1000/xyz.123"
+
+
+def test_paper_identity_falls_back_to_canonical_url():
+    assert paper_identity("https://blog.example.com/post/?utm_source=x") == "https://blog.example.com/post"
+
+
+def test_deduplicate_drops_same_paper_and_near_duplicates():
+    text = "We propose a retrieval augmented method for long document question answering with sparse attention."
+    items = [
+        {"url": "https://arxiv.org/abs/2401.12345", "title": "Sparse Retrieval for Long Documents", "description": text},
+        {"url": "https://arxiv.org/pdf/2401.12345v2", "title": "Mirror", "description": "pdf"},
+        {"url": "https://mirror.example.org/sparse", "title": "Sparse Retrieval for Long Documents", "description": "other"},
+        {"url": "https://example.com/unrelated", "title": "Protein folding with diffusion", "description": "Biology."},
+    ]
+    kept, report = deduplicate_sources(items)
+
+    assert [item["url"] for item in kept] == ["https://arxiv.org/abs/2401.12345", "https://example.com/unrelated"]
+    assert report == {"sources_in": 4, "sources_out": 2, "same_paper_dropped": 1, "near_duplicate_dropped": 1}
+
+
+def test_deduplicate_keeps_items_without_text():
+    items = [{"url": "https://a.example.com"}, {"url": "https://b.example.com"}]
+    kept, report = deduplicate_sources(items)
+    assert len(kept) == 2
+    assert report["near_duplicate_dropped"] == 0